@@ -9,14 +9,15 @@ import json
 import time 
 import threading
 import queue
-import requests
 import os
 import sys, io
-import re
 import datetime
-from src.brain import JobBrain
+from src.details import DetailStage
 from src.fetchers import Fetcher
+from src.fetchers.workday_scheduler import WorkdayScheduler
 from src.storage import JobStorage
+from src.target_scheduler import TargetScheduler, MIN_INTERVAL, MAX_INTERVAL, NOTHING_DUE_EXIT
+from src.filters import KeywordFilter
 from src.notifications import send_job_email
 
 
@@ -28,108 +29,205 @@ def safe_print(msg):
     if sys.stdout:
         sys.stdout.flush()
 
-# Use filter on the jobs it finds
-def should_keep_job(title):
+# Structured progress for the scan service (src/scan_service.py), None when run as a script
+event_sink = None
+
+def emit(event_type, **fields):
+    if event_sink:
+        event_sink(dict(fields, type=event_type))
+
+# Set by the scan service to cancel the running scan. Checked between phases and before every
+# target, page, description and AI batch starts; requests already in flight finish first
+stop_event = None
+
+class ScanCancelled(Exception):
+    """The scan was cancelled through stop_event"""
+
+def check_stop():
+    if stop_event is not None and stop_event.is_set():
+        raise ScanCancelled()
+
+# Compiled once, reloaded only when filters.txt changes
+keyword_filter = KeywordFilter("filters.txt")
+
+# Use filter on the jobs it finds, returns the keyword that rejected the title (None = keep)
+def filter_match(title, company=None):
     enable_filters = os.environ.get("ENABLE_FILTERS") == "True"
     
     if not enable_filters:
-        return True
-        
-    if not os.path.exists("filters.txt"):
-        return True
+        return None
     
     try:
-        with open("filters.txt", "r", encoding='utf-8') as f:
-            excluded_keywords = []
-            for line in f:
-                clean_line = line.strip().lower()
-                if clean_line and not clean_line.startswith("#"):
-                    keyword = clean_line.split("#")[0].strip()
-                    if keyword:
-                        excluded_keywords.append(keyword)
-        
-        title_lower = title.lower()
-        for keyword in excluded_keywords:
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, title_lower):
-                return False
-        return True
+        return keyword_filter.match(title, company)
     except Exception as e:
         safe_print(f"    [!] Error reading filters.txt: {e}")
-        return True
+        return None
+
+def should_keep_job(title, company=None):
+    return filter_match(title, company) is None
+
+# Identifies the rules filter_match() applies this scan, for the response cache
+def filter_key():
+    if os.environ.get("ENABLE_FILTERS") != "True":
+        return ""
+    try:
+        return keyword_filter.fingerprint()
+    except Exception:
+        # Unreadable filters.txt: filter_match() keeps every title, like disabled filters
+        return ""
 
 job_queue = queue.Queue()
 
+# The DB consumer writes in batches: flush every DB_BATCH_SIZE jobs or DB_BATCH_INTERVAL_MS
+DB_BATCH_SIZE = 200
+DB_BATCH_INTERVAL_MS = 500
+
 # Database Worker (Add the job if it should when a new one pop)
-def database_worker():
+# new_counts: filled with {source: jobs saved} for the scheduler
+def database_worker(new_counts=None):
     storage = JobStorage()
-    session = requests.Session() 
     ai_is_disabled = os.environ.get("AI_DISABLED_MODE") == "True"
+    relevance_status = 1 if ai_is_disabled else 0
+    pending = []
+    filtered_counts = {}
     
     safe_print(f"[DATABASE] Consumer active. AI-Skip: {ai_is_disabled}")
 
+    def flush():
+        if not pending: return
+        try:
+            saved = storage.save_jobs([job for job, _ in pending], relevance=relevance_status)
+            emit("saved", jobs=len(saved))
+            saved_ids = {id(job) for job in saved}
+            for job, source in pending:
+                if id(job) in saved_ids:
+                    if new_counts is not None:
+                        new_counts[source] = new_counts.get(source, 0) + 1
+                    safe_print(f"[SAVED] {job['title'][:40]:<40} | {source}")
+        except Exception as e:
+            safe_print(f"[!] Save Error: {e}")
+        for _ in pending:
+            job_queue.task_done()
+        pending.clear()
+
+    interval = DB_BATCH_INTERVAL_MS / 1000
+    last_flush = time.monotonic()
     while True:
-        item = job_queue.get()
-        if item is None: break
+        wait = interval - (time.monotonic() - last_flush)
+        try:
+            item = job_queue.get(timeout=max(wait, 0.01))
+        except queue.Empty:
+            flush()
+            last_flush = time.monotonic()
+            continue
+
+        if item is None:
+            flush()
+            # Balance the sentinel too, so the next scan in the same process can join() the queue
+            job_queue.task_done()
+            break
         job, source = item
         
-        if not should_keep_job(job['title']):
+        matched = filter_match(job['title'], job.get('company'))
+        if matched:
+            filtered_counts[matched] = filtered_counts.get(matched, 0) + 1
             job_queue.task_done()
-            continue
+        else:
+            pending.append((job, source))
 
-        if not storage.job_exists(job['id']):
-            try:
-                relevance_status = 1 if ai_is_disabled else 0
-                storage.save_job(job, relevance=relevance_status)
-                
-                safe_print(f"[SAVED] {job['title'][:40]:<40} | {source}")
-            except Exception as e:
-                safe_print(f"[!] Save Error: {e}")
-        
-        job_queue.task_done()
+        # A steady stream never lets get() time out, so the interval is checked here too
+        if len(pending) >= DB_BATCH_SIZE or time.monotonic() - last_flush >= interval:
+            flush()
+            last_flush = time.monotonic()
+
+    if filtered_counts:
+        top = sorted(filtered_counts.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        summary = ", ".join(f"'{k}' x{v}" for k, v in top)
+        safe_print(f"[FILTER] Dropped {sum(filtered_counts.values())} titles. Top matches: {summary}")
 
 # Scarper Wroker for fast scarping, which deliver all the data instant
-def fast_scraper_worker(targets, fetcher):
-    for target in targets:
-        try:
-            safe_print(f"[*] Fetching jobs for {target['name']}...") 
-            jobs = fetcher.fetch(target) 
-            if jobs:
-                for job in jobs:
-                    job_queue.put((job, target['name']))
-        except Exception as e:
-            safe_print(f"[!] Fast Scraper Error for {target['name']}: {e}")
+# All targets run at once, so the scan takes as long as the slowest board
+def fast_scraper_worker(targets, fetcher, on_stats=None):
+    if not targets: return
+
+    def on_result(target, jobs):
+        safe_print(f"[*] {target['name']}: {len(jobs)} jobs fetched.")
+        emit("target", name=target['name'], jobs=len(jobs))
+        for job in jobs:
+            job_queue.put((job, target['name']))
+
+    try:
+        fetcher.fetch_many(
+            targets, on_result,
+            max_concurrency=int(os.environ.get("FETCH_CONCURRENCY", 16)),
+            per_host_limit=int(os.environ.get("FETCH_PER_HOST_LIMIT", 4)),
+            on_stats=on_stats,
+            stop=stop_event
+        )
+    except Exception as e:
+        safe_print(f"[!] Fast Scraper Error: {e}")
+
+# Aggregator Worker for JobSpy (LinkedIn / Glassdoor), every search in its own process
+def aggregator_worker(targets, fetcher, on_stats=None):
+    if not targets: return
+
+    def on_result(target, jobs):
+        safe_print(f"[*] {target['name']}: {len(jobs)} jobs fetched.")
+        emit("target", name=target['name'], jobs=len(jobs))
+        for job in jobs:
+            job_queue.put((job, target['name']))
+
+    try:
+        fetcher.jobspy.fetch_many(
+            targets, on_result,
+            max_workers=int(os.environ.get("JOBSPY_WORKERS", 2)),
+            timeout=int(os.environ.get("JOBSPY_TIMEOUT", 180)),
+            on_stats=on_stats,
+            stop=stop_event
+        )
+    except Exception as e:
+        safe_print(f"[!] Aggregator Error: {e}")
 
 # Scraper Worker for slow scraping, like workday
-def round_robin_scraper_worker(targets, fetcher):
-    if not targets: return #
-    offset, limit = 0, 20
-    active_targets = list(targets)
-    target_totals = {t['name']: 0 for t in targets}
-    last_seen_ids = {t['name']: [] for t in targets}
-
-    while active_targets and offset < 2000:
-        safe_print(f"\n[WORKDAY WAVE] Offset {offset} | Active Sites: {len(active_targets)}") #
-        finished_this_wave = []
-        for target in active_targets:
-            found_jobs, has_more, total_count = fetcher.workday.fetch_single_batch(target, offset)
-            if offset == 0: target_totals[target['name']] = total_count
-            current_ids = [j['id'] for j in found_jobs]
-            if current_ids and current_ids == last_seen_ids.get(target['name']):
-                finished_this_wave.append(target)
-                continue
-            last_seen_ids[target['name']] = current_ids
-            if found_jobs:
-                safe_print(f"    [+] {target['name']}: Found {len(found_jobs)} jobs.") #
-                for job in found_jobs:
-                    job_queue.put((job, target['name'])) #
-            if (offset + limit) >= target_totals[target['name']]:
-                finished_this_wave.append(target)
-            time.sleep(0.5) 
-        for t in finished_this_wave:
-            if t in active_targets: active_targets.remove(t)
-        offset += limit
+# Every tenant paginates independently, sharing the Workday rate budget
+def workday_scraper_worker(targets, fetcher, on_stats=None):
+    if not targets: return
+
+    def on_jobs(target, jobs):
+        for job in jobs:
+            job_queue.put((job, target['name']))
+
+    safe_print(f"\n[WORKDAY] Scanning {len(targets)} tenants in parallel...")
+    scheduler = WorkdayScheduler(
+        fetcher.workday, on_jobs,
+        max_tenants=int(os.environ.get("WORKDAY_CONCURRENCY", 8)),
+        log=safe_print,
+        on_stats=on_stats,
+        stop=stop_event
+    )
+    try:
+        total = scheduler.run(targets)
+        safe_print(f"[WORKDAY] Done. {total} jobs found.")
+        emit("target", name="Workday", jobs=total)
+    except Exception as e:
+        safe_print(f"[!] Workday Scraper Error: {e}")
         
+# Fills in descriptions the list APIs did not include (Workday), only for the new jobs of this session
+def fetch_descriptions(fetcher):
+    storage = JobStorage()
+    time_threshold = (datetime.datetime.now(datetime.timezone.utc) - 
+                      datetime.timedelta(minutes=15)).strftime('%Y-%m-%d %H:%M:%S')
+    stage = DetailStage(
+        fetcher.workday, storage,
+        max_concurrency=int(os.environ.get("DETAIL_CONCURRENCY", 8)),
+        log=safe_print,
+        stop=stop_event
+    )
+    try:
+        stage.run(time_threshold)
+    except Exception as e:
+        safe_print(f"[!] Description Stage Error: {e}")
+
 # Handles AI run if enabled and email notifications 
 def run_AI_processing():
     storage = JobStorage()
@@ -138,9 +236,12 @@ def run_AI_processing():
     
     # AI BRAIN ANALYSIS
     if ai_enabled:
-        safe_print("[*] Starting AI Brain Analysis...")
-        brain = JobBrain()
-        
+        # Imported only when AI runs (openai / numpy are most of the startup time)
+        from src.brain import JobBrain, load_setting
+        from src.analysis import AnalysisStage
+        from src.preclassifier import PreClassifier
+        from src.relevance_index import RelevanceIndex, make_embedder
+
         # Look for jobs added in this session (e.g., last 15 minutes)
         time_threshold = (datetime.datetime.now(datetime.timezone.utc) - 
                           datetime.timedelta(minutes=15)).strftime('%Y-%m-%d %H:%M:%S')
@@ -153,17 +254,30 @@ def run_AI_processing():
         """, (time_threshold,))
         
         pending_jobs = cursor.fetchall()
-        for j_id, title, desc in pending_jobs:
-            analysis = brain.analyze(title, desc or "") #AI brain
-            if analysis:
-                status = 1 if analysis.is_relevant else -1
-                cursor.execute("""
-                    UPDATE jobs SET is_relevant = ?, ai_reason = ?, 
-                    tech_stack = ?, years_required = ? WHERE id = ?
-                """, (status, analysis.reason, ", ".join(analysis.tech_stack), 
-                      analysis.years_required, j_id))
-                storage.conn.commit()
-                safe_print(f"  [{'RELEVANT' if status == 1 else 'SKIPPED'}] {title[:30]}")
+        # Ticks that scanned nothing new end here, without building a client
+        if not pending_jobs:
+            return
+
+        safe_print("[*] Starting AI Brain Analysis...")
+        brain = JobBrain()
+
+        # Labeled corpus -> embedding index (only used once it is big enough)
+        index = RelevanceIndex(storage, embedder=make_embedder(load_setting("EMBEDDING_MODEL")))
+        indexed = index.refresh()
+        if indexed:
+            safe_print(f"[*] Relevance index ready ({indexed} labeled jobs).")
+
+        # AI brain, many requests at once (AI_CONCURRENCY) of AI_BATCH_SIZE jobs each, backs off on rate limits
+        stage = AnalysisStage(
+            brain, storage,
+            max_concurrency=int(os.environ.get("AI_CONCURRENCY", 8)),
+            batch_size=int(os.environ.get("AI_BATCH_SIZE", 5)),
+            classifier=PreClassifier(),
+            index=index if indexed else None,
+            log=safe_print,
+            stop=stop_event
+        )
+        stage.run(pending_jobs)
   
 # EMAIL NOTIFICATIONS              
 def send_notifications():
@@ -189,27 +303,25 @@ def send_notifications():
             cursor.execute("UPDATE jobs SET sent_email = 1 WHERE sent_email = 0 AND is_relevant = 1")
             storage.conn.commit()
 
-def main():
-    if not os.path.exists("authorization.txt"):
-        safe_print("[!] Warning: authorization.txt missing.")
-
-    safe_print("[*] Scraper started. Checking filters...") 
-    
-    config_path = os.path.join('config', 'targets.json')
-    with open(config_path, 'r') as f:
-        targets = json.load(f)
-
+# Runs the three scraper workers over `targets` and records each target's result in the schedule
+def scrape_targets(targets, fetcher, scheduler):
+    # Incremental scan: fetchers skip detail requests for jobs we already have
+    fetcher.set_known_ids(scheduler.storage.get_known_ids())
+    # Filtered titles never reach jobs.db, the response cache only waits for the kept ones
+    fetcher.set_job_filter(lambda job: should_keep_job(job.get('title'), job.get('company')), filter_key())
     # define which scarper to which worker
-    fetcher = Fetcher()
     workday_targets = [t for t in targets if t.get('type') == 'workday']
+    jobspy_targets = [t for t in targets if t.get('type') == 'jobspy']
     fast_targets = [t for t in targets if t.get('type') not in ['workday', 'jobspy']]
 
-    consumer = threading.Thread(target=database_worker, daemon=True)
+    new_counts = {}
+    consumer = threading.Thread(target=database_worker, args=(new_counts,), daemon=True)
     consumer.start()
 
     threads = [
-        threading.Thread(target=round_robin_scraper_worker, args=(workday_targets, fetcher)),
-        threading.Thread(target=fast_scraper_worker, args=(fast_targets, fetcher))
+        threading.Thread(target=workday_scraper_worker, args=(workday_targets, fetcher, scheduler.on_stats)),
+        threading.Thread(target=fast_scraper_worker, args=(fast_targets, fetcher, scheduler.on_stats)),
+        threading.Thread(target=aggregator_worker, args=(jobspy_targets, fetcher, scheduler.on_stats))
     ]
 
     for t in threads: t.start()
@@ -219,11 +331,69 @@ def main():
     job_queue.put(None)
     consumer.join()
 
+    # Targets a cancelled scan skipped stay due, so its partial results are not recorded
+    check_stop()
+    rows = scheduler.commit(targets, new_counts)
+    changed = sum(1 for row in rows if row['last_new_jobs'])
+    safe_print(f"[SCHEDULE] {changed} of {len(rows)} targets had new jobs, the rest back off.")
+
+def run_scan(fetcher=None, on_event=None, stop=None):
+    """
+    One full scan. The scan service passes its long-lived Fetcher (warm HTTP pool, Workday
+    sessions, browser), an on_event callback for structured progress and a stop Event.
+    Returns how many targets were scanned (0: a tick where none was due, only post-processing ran).
+    Raises ScanCancelled once stop is set.
+    """
+    global event_sink, stop_event
+    event_sink = on_event
+    stop_event = stop
+
+    if not os.path.exists("authorization.txt"):
+        safe_print("[!] Warning: authorization.txt missing.")
+
+    safe_print("[*] Scraper started. Checking filters...") 
+    emit("phase", phase="scrape")
+    
+    config_path = os.path.join('config', 'targets.json')
+    with open(config_path, 'r') as f:
+        targets = json.load(f)
+
+    # Adaptive schedule: only targets that are due (SCAN_ALL_TARGETS=True scans them all, and still updates their stats)
+    scheduler = TargetScheduler(
+        JobStorage(),
+        min_interval=int(os.environ.get("SCAN_MIN_INTERVAL", MIN_INTERVAL)),
+        max_interval=int(os.environ.get("SCAN_MAX_INTERVAL", MAX_INTERVAL))
+    )
+    if os.environ.get("SCAN_ALL_TARGETS", "True") != "True":
+        due = scheduler.due(targets)
+        safe_print(f"[SCHEDULE] {len(due)} of {len(targets)} targets due.")
+        if not due:
+            wait = (scheduler.next_due_at(targets) or time.time()) - time.time()
+            safe_print(f"[SCHEDULE] Nothing to scan, next target due in {max(wait, 0) / 60:.0f} min.")
+        targets = due
+
+    fetcher = fetcher or Fetcher()
+    if targets:
+        scrape_targets(targets, fetcher, scheduler)
+
+    # Runs on empty ticks too, so descriptions, verdicts and emails left over from the last scan still go out
     safe_print("\n[*] Scraper finished. Starting post-processing...")
+    check_stop()
+    emit("phase", phase="descriptions")
+    fetch_descriptions(fetcher)
     # Handles AI brain and email notifications
+    check_stop()
+    emit("phase", phase="ai")
     run_AI_processing()
+    check_stop()
+    emit("phase", phase="notifications")
     send_notifications()
     safe_print("[*] Pipeline Complete.")
+    return len(targets)
+
+def main():
+    # A tick with nothing due exits with NOTHING_DUE_EXIT, so the GUI does not count it as a scan
+    sys.exit(0 if run_scan() else NOTHING_DUE_EXIT)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
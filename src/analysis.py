@@ -0,0 +1,224 @@
+# ==============================================================================
+# Handles the AI analysis stage: many JobBrain calls at once
+# Adaptive concurrency (backs off on rate limits) + batched DB commits
+# ==============================================================================
+
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.brain import RateLimitedError, PROMPT_VERSION
+
+DEFAULT_MAX_CONCURRENCY = 8
+# Jobs packed into one JobBrain request (1 = one job per call)
+DEFAULT_BATCH_SIZE = 5
+COMMIT_EVERY = 25
+MAX_ATTEMPTS = 4
+RATE_LIMIT_COOLDOWN = 5
+
+def verdict_key(title, description, namespace=""):
+    """
+    Content hash for the verdict cache: normalized title + the 1000 chars the model sees + prompt version.
+    namespace keeps verdicts from different backends/models apart.
+    """
+    def normalize(text):
+        return re.sub(r"\s+", " ", (text or "").lower()).strip()
+    content = f"{PROMPT_VERSION}\n{namespace}\n{normalize(title)}\n{normalize((description or '')[:1000])}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class AdaptiveLimiter:
+    """AIMD limit: +1 slot after a streak of successes, halved (and paused) on every rate-limit error"""
+
+    def __init__(self, maximum, initial=None, minimum=1, increase_after=5):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = initial or max(minimum, maximum // 2)
+        self.increase_after = increase_after
+        self.in_flight = 0
+        self.successes = 0
+        self.paused_until = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                elif self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                else:
+                    self.cond.wait()
+
+    def release(self, rate_limited=False, retry_after=None):
+        with self.cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(self.minimum, self.limit // 2)
+                self.successes = 0
+                self.paused_until = time.monotonic() + (retry_after or RATE_LIMIT_COOLDOWN)
+            else:
+                self.successes += 1
+                if self.successes >= self.increase_after and self.limit < self.maximum:
+                    self.limit += 1
+                    self.successes = 0
+            self.cond.notify_all()
+
+
+class AnalysisStage:
+    def __init__(self, brain, storage, max_concurrency=DEFAULT_MAX_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE,
+                 commit_every=COMMIT_EVERY, classifier=None, index=None, log=print, stop=None):
+        self.brain = brain
+        self.storage = storage
+        # Optional local PreClassifier, decides obvious jobs without the model
+        self.classifier = classifier
+        # Optional RelevanceIndex, auto-labels jobs that look like confidently labeled ones
+        self.index = index
+        self.max_concurrency = max_concurrency
+        self.batch_size = max(1, batch_size)
+        self.commit_every = commit_every
+        self.log = log
+        # Optional threading.Event, batches not sent yet are skipped once it is set
+        self.stop = stop
+        self.limiter = AdaptiveLimiter(max_concurrency)
+
+    def _request(self, jobs):
+        """
+        One JobBrain request through the limiter, retried on rate limits with only the jobs still missing.
+        Returns ({job_id: analysis}, whether the model answered)
+        """
+        results = {}
+        for _ in range(MAX_ATTEMPTS):
+            if self.stop is not None and self.stop.is_set():
+                break
+            missing = [job for job in jobs if job[0] not in results]
+            self.limiter.acquire()
+            try:
+                results.update(self.brain.analyze_batch(missing, fallback=False))
+            except RateLimitedError as e:
+                results.update(e.partial)
+                self.limiter.release(rate_limited=True, retry_after=e.retry_after)
+                self.log(f"    [!] AI rate limit hit. Concurrency now {self.limiter.limit}.")
+                continue
+            except Exception as e:
+                self.limiter.release()
+                self.log(f"    [!] AI Analysis Error: {e}")
+                break
+            self.limiter.release()
+            return results, True
+        return results, False
+
+    def _analyze(self, chunk):
+        """Runs in a worker thread. Returns [(job, analysis or None)] for a chunk of jobs"""
+        results, answered = self._request(chunk)
+        if answered and len(chunk) > 1:
+            # Jobs the batch answer left out (or got wrong) are asked one by one, each through the limiter
+            for job in chunk:
+                if job[0] not in results:
+                    results.update(self._request([job])[0])
+        return [(job, results.get(job[0])) for job in chunk]
+
+    def _extract(self, job):
+        """(tech_stack, years_required) for verdicts that don't come from the model"""
+        if not self.classifier:
+            return "", 0
+        text = self.classifier.clean_text(job[2])
+        years = self.classifier.extract_years(text)
+        return ", ".join(self.classifier.extract_tech(text)), min(low for low, _ in years) if years else 0
+
+    def _record(self, job, verdict, tag=""):
+        """Queues the DB update for one job. verdict = (status, reason, tech_stack, years_required)"""
+        self.updates.append((*verdict, job[0]))
+        self.log(f"  [{'RELEVANT' if verdict[0] == 1 else 'SKIPPED'}]{tag} {job[1][:30]}")
+        # Batched commits instead of one per job
+        if len(self.updates) >= self.commit_every:
+            self._flush()
+
+    def _flush(self):
+        self.storage.save_analyses(self.updates)
+        self.storage.save_verdicts(self.new_verdicts)
+        self.updates.clear()
+        self.new_verdicts.clear()
+
+    def run(self, pending_jobs):
+        """pending_jobs: (id, title, description) rows. Returns the number of jobs that got a verdict"""
+        if not pending_jobs:
+            return 0
+
+        start = time.time()
+        self.updates = []
+        self.new_verdicts = []
+        analyzed = 0
+
+        # Local rules first, only ambiguous jobs continue
+        rule_decided = 0
+        if self.classifier:
+            ambiguous = []
+            for job in pending_jobs:
+                verdict = self.classifier.classify(job[1], job[2])
+                if verdict:
+                    self._record(job, verdict, " (rules)")
+                    rule_decided += 1
+                    analyzed += 1
+                else:
+                    ambiguous.append(job)
+        else:
+            ambiguous = pending_jobs
+
+        # Same content (reposts, the same job on several boards) -> one group, one model call
+        groups = {}
+        for job in ambiguous:
+            groups.setdefault(verdict_key(job[1], job[2], self.brain.cache_namespace), []).append(job)
+
+        cache_hits = 0
+        for key, verdict in self.storage.get_cached_verdicts(list(groups)).items():
+            for job in groups.pop(key):
+                self._record(job, verdict, " (cached)")
+                cache_hits += 1
+                analyzed += 1
+
+        to_analyze = [jobs[0] for jobs in groups.values()]
+        key_of = {job[0]: key for key, jobs in groups.items() for job in jobs}
+        cache_misses = len(to_analyze)
+
+        # One vectorized pass against the labeled corpus, only the uncertain band goes on to the model
+        index_decided = 0
+        if self.index is not None and to_analyze:
+            probabilities = self.index.score([(job[1], job[2]) for job in to_analyze])
+            uncertain = []
+            for job, probability in zip(to_analyze, probabilities):
+                decided = self.index.verdict(probability)
+                if not decided:
+                    uncertain.append(job)
+                    continue
+                verdict = (*decided, *self._extract(job))
+                for same_job in groups[key_of[job[0]]]:
+                    self._record(same_job, verdict, " (index)")
+                    index_decided += 1
+                    analyzed += 1
+            to_analyze = uncertain
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            chunks = [to_analyze[i:i + self.batch_size] for i in range(0, len(to_analyze), self.batch_size)]
+            futures = [pool.submit(self._analyze, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for job, analysis in future.result():
+                    if not analysis:
+                        continue
+                    status = 1 if analysis.is_relevant else -1
+                    verdict = (status, analysis.reason, ", ".join(analysis.tech_stack), analysis.years_required)
+                    key = key_of[job[0]]
+                    self.new_verdicts.append((key, *verdict))
+                    for same_job in groups[key]:
+                        self._record(same_job, verdict)
+                        analyzed += 1
+                    cache_hits += len(groups[key]) - 1
+
+        self._flush()
+        self.log(f"[*] AI analyzed {analyzed}/{len(pending_jobs)} jobs in {time.time() - start:.1f}s "
+                 f"| Rules: {rule_decided} | Verdict cache: {cache_hits} hits, {cache_misses} misses "
+                 f"| Index: {index_decided} | Sent to model: {len(to_analyze)}")
+        return analyzed
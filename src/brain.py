@@ -3,39 +3,189 @@
 # Handles definition how the Open AI behaves and its output
 # ==============================================================================
 
-from openai import OpenAI
-from pydantic import BaseModel, Field
 import os
+from functools import lru_cache
 
-# Define the output structure for the AI
-class JobAnalysis(BaseModel):
-    is_relevant: bool = Field(description="True if the job is suitable for 0-3 years experience. False if it's Senior/Staff/Lead/etc..")
-    years_required: int = Field(description="The minimum years of experience mentioned (0 if not specified).")
-    tech_stack: list[str] = Field(description="Extract 1 to 5 specific tech keywords (languages, frameworks, OS) mentioned, ignoring HTML tags.")
-    reason: str = Field(description="One short sentence explaining why it is or isn't relevant.")
+@lru_cache(maxsize=None)
+def schemas():
+    """
+    (JobAnalysis, BatchJobAnalysis) output structures for the AI.
+    Built on first use, so importing this module does not pull in pydantic.
+    """
+    from pydantic import BaseModel, Field
+
+    # Define the output structure for the AI
+    class JobAnalysis(BaseModel):
+        is_relevant: bool = Field(description="True if the job is suitable for 0-3 years experience. False if it's Senior/Staff/Lead/etc..")
+        years_required: int = Field(description="The minimum years of experience mentioned (0 if not specified).")
+        tech_stack: list[str] = Field(description="Extract 1 to 5 specific tech keywords (languages, frameworks, OS) mentioned, ignoring HTML tags.")
+        reason: str = Field(description="One short sentence explaining why it is or isn't relevant.")
+
+    class BatchJobAnalysisItem(JobAnalysis):
+        job_id: str = Field(description="The Job ID exactly as it was given in the prompt.")
+
+    class BatchJobAnalysis(BaseModel):
+        results: list[BatchJobAnalysisItem] = Field(description="One analysis per job in the prompt.")
+
+    return JobAnalysis, BatchJobAnalysis
+
+def __getattr__(name):
+    # Keeps `from src.brain import JobAnalysis` working
+    if name == "JobAnalysis":
+        return schemas()[0]
+    if name == "BatchJobAnalysis":
+        return schemas()[1]
+    raise AttributeError(name)
+
+# Bump when the prompt/rules change, so cached verdicts from the old prompt are not reused
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = "You are a tech recruiter in Israel filtering for Entry-level/Junior engineers."
+
+RULES = """
+        Rules:
+        1. Suitable = 0-3 years experience.
+        2. Unsuitable = 4+ years, Lead, Staff, or Management.
+        3. If it's a 'Student' or 'Intern' or 'Junior' or 'Assosicate' role, it is ALWAYS relevant.
+"""
+
+class RateLimitedError(Exception):
+    """
+    Raised by JobBrain when the API keeps answering 429, so callers can slow down.
+    partial: {job_id: JobAnalysis} that analyze_batch() already had, so only the rest is retried
+    """
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.partial = {}
+
+# Default model for the OpenAI-compatible backends, AI_MODEL overrides it
+DEFAULT_MODEL = "gpt-4o-mini" # Cheapest and fastest for this task
+
+def load_setting(key_name):
+    """Environment variable first (handy for benchmarks), then the central authorization.txt file."""
+    if os.environ.get(key_name):
+        return os.environ[key_name]
+    try:
+        if not os.path.exists("authorization.txt"): return None
+        with open("authorization.txt", "r") as f:
+            for line in f:
+                if "=" in line:
+                    k, v = line.split("=", 1)
+                    if k.strip() == key_name: return v.strip()
+    except: return None
+    return None
+
+class ChatBackend:
+    """Any OpenAI-compatible chat API: OpenAI itself, a self-hosted server or the bundled mock."""
+    structured = True
+
+    def __init__(self, api_key, base_url=None, model=DEFAULT_MODEL):
+        # Imported here: openai is the slowest import of the whole pipeline
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.model = model
+        self.name = f"chat:{model}@{base_url or 'openai'}"
+
+    def parse(self, prompt, response_format):
+        """Structured-output call shared by analyze() and analyze_batch()"""
+        from openai import RateLimitError
+        try:
+            completion = self.client.beta.chat.completions.parse(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=response_format,
+            )
+            return completion.choices[0].message.parsed
+        except RateLimitError as e:
+            retry_after = None
+            try:
+                retry_after = float(e.response.headers.get("retry-after"))
+            except (AttributeError, TypeError, ValueError):
+                pass
+            raise RateLimitedError(str(e), retry_after)
+
+class LocalModelBackend:
+    """Offline CPU backend: local_model.LocalRelevanceModel + the pre-classifier extractors."""
+    structured = False
+
+    def __init__(self, model):
+        from src.preclassifier import PreClassifier
+        self.model = model
+        self.rules = PreClassifier()
+        self.name = "local"
+
+    def analyze(self, job_title, job_description):
+        probability = self.model.predict_proba(job_title, job_description)
+        text = self.rules.clean_text(job_description)
+        years = self.rules.extract_years(text)
+        JobAnalysis, _ = schemas()
+        return JobAnalysis(
+            is_relevant=probability >= 0.5,
+            years_required=min(low for low, _ in years) if years else 0,
+            tech_stack=self.rules.extract_tech(text),
+            reason=f"Local model: {probability:.0%} likely to fit a junior.",
+        )
 
 class JobBrain:
-    def __init__(self):
-        self.api_key = self._load_api_key()
-        if not self.api_key:
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=self.api_key)
+    """
+    AI_BACKEND (env or authorization.txt) picks the backend:
+        openai  OpenAI API (default), OPENAI_BASE_URL points it at any compatible server
+        mock    bundled deterministic mock server (src/mock_llm.py), no network needed
+        local   CPU model trained on jobs.db (python -m src.local_model train)
+    """
+    def __init__(self, backend=None):
+        self.backend = backend or self._make_backend()
+
+    @property
+    def cache_namespace(self):
+        """Verdicts from different backends/models must not share cache entries"""
+        return self.backend.name if self.backend else ""
+
+    def _make_backend(self):
+        kind = (load_setting("AI_BACKEND") or "openai").lower()
+        model = load_setting("AI_MODEL") or DEFAULT_MODEL
+        base_url = load_setting("OPENAI_BASE_URL")
+
+        if kind == "local":
+            from src.local_model import LocalRelevanceModel
+            local_model = LocalRelevanceModel.load()
+            if not local_model:
+                print("    [!] AI_BACKEND=local but local_model.json is missing. Run: python -m src.local_model train")
+                return None
+            return LocalModelBackend(local_model)
+
+        if kind == "mock":
+            if not base_url:
+                # No external mock configured, run one inside this process
+                from src.mock_llm import start_mock_server
+                _, base_url = start_mock_server(
+                    latency=float(load_setting("MOCK_LLM_LATENCY") or 0.2),
+                    error_rate=float(load_setting("MOCK_LLM_ERROR_RATE") or 0),
+                    rate_limit_rate=float(load_setting("MOCK_LLM_RATE_LIMIT_RATE") or 0),
+                )
+            return ChatBackend("mock-key", base_url, model)
+
+        api_key = self._load_api_key()
+        if not api_key:
+            return None
+        return ChatBackend(api_key, base_url, model)
 
     def _load_api_key(self):
         """Reads the key from the central authorization.txt file."""
-        try:
-            if not os.path.exists("authorization.txt"): return None
-            with open("authorization.txt", "r") as f:
-                for line in f:
-                    if line.startswith("OPENAI_API_KEY="):
-                        return line.split("=")[1].strip()
-        except: return None
-        return None
+        return load_setting("OPENAI_API_KEY")
+
+    def _parse(self, prompt, response_format):
+        return self.backend.parse(prompt, response_format)
 
     def analyze(self, job_title, job_description):
-        if not self.client:
+        if not self.backend:
             return None
+        if not self.backend.structured:
+            return self.backend.analyze(job_title, job_description)
 
         # We only send the first 1000 characters to save tokens/money
         clean_description = job_description[:1000].replace('\n', ' ')
@@ -44,23 +194,73 @@ class JobBrain:
         Analyze this job for a Junior SWE (0-3 years experience).
         Title: {job_title}
         Description: {clean_description}
-        
-        Rules:
-        1. Suitable = 0-3 years experience.
-        2. Unsuitable = 4+ years, Lead, Staff, or Management.
-        3. If it's a 'Student' or 'Intern' or 'Junior' or 'Assosicate' role, it is ALWAYS relevant.
+        {RULES}
         """
 
         try:
-            completion = self.client.beta.chat.completions.parse(
-                model="gpt-4o-mini", # Cheapest and fastest for this task
-                messages=[
-                    {"role": "system", "content": "You are a tech recruiter in Israel filtering for Entry-level/Junior engineers."},
-                    {"role": "user", "content": prompt},
-                ],
-                response_format=JobAnalysis,
-            )
-            return completion.choices[0].message.parsed
+            return self._parse(prompt, schemas()[0])
+        except RateLimitedError:
+            raise
         except Exception as e:
             print(f"    [!] AI Analysis Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def analyze_batch(self, jobs, fallback=True):
+        """
+        Packs several jobs into one request so the rules are only sent once.
+        jobs: list of (job_id, title, description)
+        Returns {job_id: JobAnalysis}. Jobs missing from (or invalid in) the batch answer
+        are retried one by one with analyze() (fallback=False leaves that to the caller);
+        jobs that still fail are left out. A RateLimitedError carries the results so far in .partial.
+        """
+        if not self.backend or not jobs:
+            return {}
+        if len(jobs) == 1 or not self.backend.structured:
+            return self._analyze_each(jobs, {})
+
+        listing = ""
+        for j_id, title, desc in jobs:
+            clean_description = (desc or "")[:1000].replace('\n', ' ')
+            listing += f"""
+        --- Job ID: {j_id} ---
+        Title: {title}
+        Description: {clean_description}
+        """
+
+        prompt = f"""
+        Analyze each of these {len(jobs)} jobs for a Junior SWE (0-3 years experience).
+        Return exactly one result per job, with job_id copied exactly as given.
+        {listing}
+        {RULES}
+        """
+
+        JobAnalysis, BatchJobAnalysis = schemas()
+        results = {}
+        try:
+            parsed = self._parse(prompt, BatchJobAnalysis)
+            expected = {str(j_id) for j_id, _, _ in jobs}
+            for item in parsed.results:
+                if item.job_id in expected and item.job_id not in results:
+                    results[item.job_id] = JobAnalysis(**item.model_dump(exclude={"job_id"}))
+        except RateLimitedError:
+            raise
+        except Exception as e:
+            print(f"    [!] AI Batch Error ({len(jobs)} jobs), falling back to single calls: {e}")
+
+        answered = {j_id: results[str(j_id)] for j_id, _, _ in jobs if str(j_id) in results}
+        if not fallback:
+            return answered
+        # Fallback for anything the batch answer didn't cover
+        return self._analyze_each([job for job in jobs if job[0] not in answered], answered)
+
+    def _analyze_each(self, jobs, results):
+        """analyze() per job, added to results. A rate limit keeps what was analyzed in .partial"""
+        for j_id, title, desc in jobs:
+            try:
+                analysis = self.analyze(title, desc or "")
+            except RateLimitedError as e:
+                e.partial = results
+                raise
+            if analysis:
+                results[j_id] = analysis
+        return results
@@ -11,4 +11,6 @@ TEXT_GREY = "#6A6A6A"
 # Window & System Settings
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 900
-RESULTS_PER_PAGE = 10
\ No newline at end of file
+RESULTS_PER_PAGE = 10
+# Auto-mode asks for due targets this often (seconds)
+AUTO_SCAN_TICK = 300
\ No newline at end of file
@@ -0,0 +1,55 @@
+# ==============================================================================
+# Handles the description detail stage
+# Boards whose list API has no description (Workday) are completed here, after
+# dedup against jobs.db, so only genuinely new jobs cost a detail request
+# ==============================================================================
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_MAX_CONCURRENCY = 8
+COMMIT_EVERY = 25
+
+class DetailStage:
+    def __init__(self, fetcher, storage, max_concurrency=DEFAULT_MAX_CONCURRENCY, commit_every=COMMIT_EVERY, log=print, stop=None):
+        """
+        fetcher: anything with fetch_description(description_url, name) -> text or None (WorkdayFetcher)
+        stop: optional threading.Event, descriptions not requested yet are skipped once it is set
+        """
+        self.fetcher = fetcher
+        self.storage = storage
+        self.max_concurrency = max_concurrency
+        self.commit_every = commit_every
+        self.log = log
+        self.stop = stop
+
+    def _fetch(self, url, company):
+        if self.stop is not None and self.stop.is_set():
+            return None
+        return self.fetcher.fetch_description(url, company)
+
+    def run(self, since):
+        """Fetches the missing descriptions of jobs found after `since`. Returns how many were stored"""
+        rows = self.storage.get_missing_descriptions(since)
+        if not rows:
+            return 0
+
+        self.log(f"[*] Fetching {len(rows)} job descriptions...")
+        pending, stored, failed = [], 0, 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {pool.submit(self._fetch, url, company): job_id
+                       for job_id, company, url in rows}
+            for future in as_completed(futures):
+                text = future.result()
+                if not text:
+                    failed += 1
+                    continue
+                pending.append((text, futures[future]))
+                if len(pending) >= self.commit_every:
+                    self.storage.save_descriptions(pending)
+                    stored += len(pending)
+                    pending.clear()
+
+        self.storage.save_descriptions(pending)
+        stored += len(pending)
+        self.log(f"[*] Descriptions: {stored} stored, {failed} failed.")
+        return stored
@@ -6,11 +6,15 @@
 
 import subprocess, os, threading, time, datetime, sys
 from src.notifications import send_job_email
+from src.target_scheduler import NOTHING_DUE_EXIT
 
 class AppEngine:
     def __init__(self, storage):
         self.storage = storage
         self.pipeline_process = None
+        self.service_client = None
+        # Set by STOP, so a scan that is still starting up does not begin afterwards
+        self.stop_requested = False
         self.is_running = False
         self.last_run_timestamp = 0
         self.ai_enabled = False
@@ -67,12 +71,74 @@ class AppEngine:
             print(f"Error opening file {filename}: {e}")
 
     def stop_pipeline(self):
-        """Terminates the scraper process."""
-        if self.pipeline_process:
+        """Terminates the scraper process, or cancels the scan in the service (which stays warm)."""
+        self.stop_requested = True
+        if self.service_client:
+            try:
+                self.service_client.cancel()
+            except OSError:
+                pass
+        elif self.pipeline_process:
             self.pipeline_process.terminate()
 
-    def run_pipeline(self, log_callback, finish_callback):
-        """Executes the self-contained scraper pipeline and logs all output."""
+    def _run_in_service(self, env, startupinfo, log_callback):
+        """
+        Runs the scan in the resident scan service, starting it if needed.
+        Raises OSError only if the service could not be reached or started before it accepted the scan.
+        """
+        from src.scan_service import ScanClient, ScanBusyError, ScanLostError, SCAN_OPTIONS, start_service_process
+
+        client = ScanClient()
+        if not client.is_alive():
+            log_callback("SYSTEM: Starting scan service...")
+            start_service_process(env, startupinfo)
+        self.service_client = client
+
+        def on_event(event):
+            # STOP pressed while the scan was being accepted found nothing to cancel yet
+            if event["type"] == "scan_started" and self.stop_requested:
+                try:
+                    client.cancel()
+                except OSError:
+                    pass
+            if event["type"] == "log":
+                if sys.stdout:
+                    try:
+                        print(event["message"])
+                    except:
+                        pass
+                log_callback(event["message"])
+
+        try:
+            if self.stop_requested:
+                log_callback("SYSTEM: Scan stopped")
+                return
+            result = client.scan({key: env[key] for key in SCAN_OPTIONS}, on_event)
+        except ScanBusyError as e:
+            log_callback(f"SYSTEM: {e}")
+            return
+        except ScanLostError as e:
+            # The scan was accepted, so running it again in a subprocess could scan twice
+            log_callback("SYSTEM: Scan stopped" if self.stop_requested else f"SYSTEM: Scan failed: {e}")
+            return
+        finally:
+            self.service_client = None
+
+        if result["status"] == "cancelled":
+            log_callback("SYSTEM: Scan stopped")
+        elif result["status"] == "ok" and result.get("targets") == 0:
+            log_callback("SYSTEM: No targets were due")
+        elif result["status"] == "ok":
+            finish_ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.save_auth_value("LAST_SCAN_TIME", finish_ts)
+            log_callback(f"SYSTEM: Scan finished in {result['seconds']}s")
+        else:
+            log_callback(f"SYSTEM: Scan failed: {result.get('error')}")
+
+    def run_pipeline(self, log_callback, finish_callback, full_scan=True):
+        """Executes the self-contained scraper pipeline and logs all output.
+        full_scan=False only visits the targets the adaptive schedule says are due (SCAN_ALL_TARGETS)."""
+        self.stop_requested = False
         try:
             # Refresh settings from the authorization file
             self.ai_enabled = self.get_auth_value("AI_ENABLED") == "True"
@@ -85,6 +151,11 @@ class AppEngine:
             env["AI_DISABLED_MODE"] = "True" if not self.ai_enabled else "False"
             env["EMAIL_ENABLED"] = "True" if self.email_enabled else "False"
             env["RECIPIENT_EMAIL"] = self.user_email
+            # ADAPTIVE_SCHEDULE=False in authorization.txt makes every scan visit all targets
+            adaptive = self.get_auth_value("ADAPTIVE_SCHEDULE") != "False"
+            env["SCAN_ALL_TARGETS"] = "True" if full_scan or not adaptive else "False"
+            # FULL_SCAN=True (ignore the conditional-GET cache) stays an environment override
+            env.setdefault("FULL_SCAN", "False")
 
             # 3. Prevent black terminal window on Windows
             startupinfo = None
@@ -93,6 +164,18 @@ class AppEngine:
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 startupinfo.wShowWindow = 0 
 
+            # Resident scan service keeps connections, sessions and the browser warm between scans
+            # (SCAN_SERVICE=False in authorization.txt falls back to one process per scan)
+            if self.get_auth_value("SCAN_SERVICE") != "False":
+                try:
+                    self._run_in_service(env, startupinfo, log_callback)
+                    return
+                except OSError as e:
+                    if self.stop_requested:
+                        log_callback("SYSTEM: Scan stopped")
+                        return
+                    log_callback(f"SYSTEM: Scan service unavailable ({e}), running a one-off pipeline")
+
             # 4. Launch the consolidated pipeline
             self.pipeline_process = subprocess.Popen(
                 [sys.executable, "-u", "run_pipeline.py"],
@@ -124,7 +207,9 @@ class AppEngine:
 
             self.pipeline_process.wait()
             
-            if self.pipeline_process.returncode == 0:
+            if self.pipeline_process.returncode == NOTHING_DUE_EXIT:
+                log_callback("SYSTEM: No targets were due")
+            elif self.pipeline_process.returncode == 0:
                 finish_ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 self.save_auth_value("LAST_SCAN_TIME", finish_ts)
             else:
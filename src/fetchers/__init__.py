@@ -1,44 +1,100 @@
-from .workday import WorkdayFetcher
-from .smartrecruiters import SmartRecruitersFetcher
-from .greenhouse import GreenhouseFetcher
-from .comeet import ComeetFetcher
-from .lever import LeverFetcher
-from .jobspy_aggr import JobSpyFetcher
-from .generic import GenericHTMLFetcher
+import asyncio
+import importlib
+import threading
+from .concurrency import AsyncFetchEngine, DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_LIMIT
+
+# Target type -> (module, class). Modules are imported on first use, so a scan only
+# pays for the fetchers (and their pandas / playwright / parser imports) it needs
+FETCHER_CLASSES = {
+    'generic': ('.generic', 'GenericHTMLFetcher'),
+    'workday': ('.workday', 'WorkdayFetcher'),
+    'smartrecruiters': ('.smartrecruiters', 'SmartRecruitersFetcher'),
+    'greenhouse': ('.greenhouse', 'GreenhouseFetcher'),
+    'comeet': ('.comeet', 'ComeetFetcher'),
+    'lever': ('.lever', 'LeverFetcher'),
+    'jobspy': ('.jobspy_aggr', 'JobSpyFetcher'),
+}
 
 class Fetcher:
     def __init__(self):
-        # We initialize them once to stay efficient
-        self.workday = WorkdayFetcher()
-        self.smartrecruiters = SmartRecruitersFetcher()
-        self.greenhouse = GreenhouseFetcher()
-        self.comeet = ComeetFetcher()
-        self.lever = LeverFetcher()
-        self.jobspy = JobSpyFetcher()
-        self.generic = GenericHTMLFetcher()
+        # Each fetcher is created once, on first use
+        self._fetchers = {}
+        self._known_ids = frozenset()
+        self._job_filter = (None, "")
+        self._lock = threading.Lock()
+
+    def __getattr__(self, fetcher_type):
+        """fetcher.workday, fetcher.jobspy, ... as shortcuts for get_fetcher()"""
+        if fetcher_type in FETCHER_CLASSES:
+            return self.get_fetcher(fetcher_type)
+        raise AttributeError(fetcher_type)
+
+    def get_fetcher(self, fetcher_type):
+        """Returns the fetcher instance for a target type (None if unknown)"""
+        if fetcher_type not in FETCHER_CLASSES:
+            return None
+        with self._lock:
+            if fetcher_type not in self._fetchers:
+                module_name, class_name = FETCHER_CLASSES[fetcher_type]
+                module = importlib.import_module(module_name, __name__)
+                fetcher = getattr(module, class_name)()
+                fetcher.known_ids = self._known_ids
+                fetcher.job_filter, fetcher.filter_key = self._job_filter
+                self._fetchers[fetcher_type] = fetcher
+            return self._fetchers[fetcher_type]
+
+    def set_known_ids(self, known_ids):
+        """Shares the IDs already in jobs.db with every fetcher (incremental scan)"""
+        with self._lock:
+            self._known_ids = frozenset(known_ids)
+            for fetcher in self._fetchers.values():
+                fetcher.known_ids = self._known_ids
+
+    def set_job_filter(self, keep, key):
+        """Shares the scan's title filter, keep(job) -> bool, and a key naming its rules with every fetcher"""
+        with self._lock:
+            self._job_filter = (keep, key)
+            for fetcher in self._fetchers.values():
+                fetcher.job_filter, fetcher.filter_key = self._job_filter
 
     def fetch(self, target_config):
         """Your original full-crawl logic"""
         fetcher_type = target_config.get('type')
+        fetcher = self.get_fetcher(fetcher_type)
         
-        # FIX: Ensure we use target_config consistently
-        if fetcher_type == 'generic': 
-            return self.generic.fetch(target_config)  
-        elif fetcher_type == 'workday':
-            return self.workday.fetch(target_config)
-        elif fetcher_type == 'smartrecruiters':
-            return self.smartrecruiters.fetch(target_config)
-        elif fetcher_type == 'greenhouse':
-            return self.greenhouse.fetch(target_config)
-        elif fetcher_type == 'comeet':
-            return self.comeet.fetch(target_config)
-        elif fetcher_type == 'lever':
-            return self.lever.fetch(target_config)
-        elif fetcher_type == 'jobspy':
-            return self.jobspy.fetch(target_config)
-        else:
+        if fetcher is None:
+            print(f"[!] Unknown fetcher type: {fetcher_type}")
+            return []
+        return fetcher.fetch(target_config)
+
+    async def fetch_async(self, target_config):
+        """Async version of fetch() for a single target"""
+        fetcher_type = target_config.get('type')
+        fetcher = self.get_fetcher(fetcher_type)
+
+        if fetcher is None:
             print(f"[!] Unknown fetcher type: {fetcher_type}")
             return []
+        return await fetcher.fetch_async(target_config)
+
+    def fetch_many(self, targets, on_result, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host_limit=DEFAULT_PER_HOST_LIMIT, on_stats=None, stop=None):
+        """
+        Fetches all targets at once (bounded globally and per host).
+        on_result(target_config, jobs) is called as each target finishes,
+        on_stats(target_config, seconds, error) with its fetch time when given.
+        Targets not started yet are skipped once the optional stop Event is set.
+        Returns the total number of jobs found.
+        """
+        work = []
+        for target in targets:
+            fetcher = self.get_fetcher(target.get('type'))
+            if fetcher is None:
+                print(f"[!] Unknown fetcher type: {target.get('type')}")
+                continue
+            work.append((fetcher, target))
+
+        engine = AsyncFetchEngine(max_concurrency=max_concurrency, per_host_limit=per_host_limit)
+        return asyncio.run(engine.run(work, on_result, on_stats, stop))
 
     def fetch_single_batch(self, target_config, offset):
         """NEW: Routes the Round-Robin wave calls"""
@@ -49,4 +105,4 @@ class Fetcher:
             return self.workday.fetch_single_batch(target_config, offset)
         
         # Other types currently don't use the round-robin/batch logic
-        return [], False, 0
\ No newline at end of file
+        return [], False, 0
@@ -0,0 +1,80 @@
+# ==============================================================================
+# Handles the "api" option of generic targets
+# A rendered page usually fills its listing from a JSON XHR. We record that
+# request once, map its items to jobs with JSONPath-style paths, and later runs
+# call the endpoint directly without a browser
+# ==============================================================================
+
+import re
+from urllib.parse import urljoin
+from .json_store import JsonStore
+
+# Captured endpoints per target URL, re-captured after a week or when a direct call fails
+ENDPOINTS_PATH = "api_endpoints.json"
+ENDPOINT_TTL = 7 * 24 * 3600
+endpoint_store = JsonStore(ENDPOINTS_PATH)
+
+# Request headers worth replaying (cookies and browser identity are left out)
+REPLAY_HEADERS = ("accept", "content-type")
+
+PATH_TOKEN = re.compile(r"([^.\[\]]+)|\[(\d+|\*)\]")
+
+def json_path(data, path):
+    """
+    Values at a JSONPath-style path, always as a list.
+    Supports "$.data.jobs[*]", "locations[0].name", "title".
+    """
+    values = [data]
+    for name, index in PATH_TOKEN.findall(path.lstrip("$").lstrip(".")):
+        found = []
+        for value in values:
+            if name:
+                if isinstance(value, dict) and name in value:
+                    found.append(value[name])
+            elif index == "*":
+                if isinstance(value, list):
+                    found.extend(value)
+            elif isinstance(value, list) and int(index) < len(value):
+                found.append(value[int(index)])
+        values = found
+    return values
+
+def first(data, path):
+    values = json_path(data, path) if path else []
+    return values[0] if values else None
+
+def map_items(payload, target_config):
+    """
+    Jobs from one JSON response, using target_config["api"]:
+      "items": path of the job list, "fields": {"title", "url", "id", "location", "posted_on": path}
+    """
+    api = target_config["api"]
+    fields = api.get("fields", {})
+    items = json_path(payload, api.get("items", "$"))
+    # "data.jobs" points at the list itself, "data.jobs[*]" at its elements
+    if len(items) == 1 and isinstance(items[0], list):
+        items = items[0]
+
+    base_url = target_config.get("base_url") or target_config["url"]
+    jobs = []
+    for item in items:
+        title = first(item, fields.get("title", "title"))
+        link = first(item, fields.get("url", "url"))
+        if not title or not link:
+            continue
+        link = urljoin(base_url, str(link))
+        jobs.append({
+            "company": target_config.get("name", "Unknown"),
+            "title": str(title).strip(),
+            "location": first(item, fields.get("location")) or target_config.get("location", "Israel"),
+            "url": link,
+            "id": str(first(item, fields.get("id")) or link),
+            "posted_on": first(item, fields.get("posted_on")) or "Recent"
+        })
+    return jobs
+
+def describe_request(request):
+    """Replayable form of a Playwright request"""
+    headers = {k: v for k, v in request.headers.items()
+               if k.lower() in REPLAY_HEADERS or k.lower().startswith("x-")}
+    return {"method": request.method, "url": request.url, "post_data": request.post_data, "headers": headers}
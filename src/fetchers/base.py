@@ -1,10 +1,32 @@
+import asyncio
 from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from .http_client import get_http_client
+from .response_cache import get_response_cache
+
+class FetchError(Exception):
+    """
+    A board could not be read (bad status, crash before any job was parsed).
+    Raised instead of returning [], so the scan counts the target as failed; the fetcher already printed why
+    """
 
 class BaseFetcher(ABC):
     """
     Abstract Base Class that all fetchers must inherit from.
     Enforces that every fetcher has a fetch() method.
     """
+
+    # Host the fetcher talks to, used for the per-host concurrency limit.
+    # Fetchers that read it from the target config (Workday, Generic) leave it as None.
+    HOST = None
+    # Key into http_client.RATE_LIMITS
+    ATS_TYPE = "default"
+    # IDs already in jobs.db (set by Fetcher.set_known_ids at scan start)
+    known_ids = frozenset()
+    # keep(job) of the scan's title filter and a key identifying its rules (Fetcher.set_job_filter).
+    # Jobs it drops never reach jobs.db, so the response cache does not wait for them
+    job_filter = None
+    filter_key = ""
     
     @abstractmethod
     def fetch(self, target_config):
@@ -12,4 +34,53 @@ class BaseFetcher(ABC):
         Input: target_config (dict)
         Output: List of job dictionaries
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def fetch_async(self, target_config):
+        """
+        Async version of fetch() used by the concurrent engine.
+        The blocking fetch() runs in a worker thread, so a slow board never holds up the others.
+        """
+        return await asyncio.to_thread(self.fetch, target_config)
+
+    def get_host(self, target_config):
+        """Returns the host key used to group targets for the per-host limit."""
+        if self.HOST:
+            return self.HOST
+        return urlparse(target_config.get('url', '')).hostname or target_config.get('type', 'unknown')
+
+    def is_known(self, job_id):
+        """True if the job is already stored, so expensive detail requests can be skipped"""
+        return job_id is not None and str(job_id) in self.known_ids
+
+    @property
+    def http(self):
+        """Shared pooled HTTP client (keep-alive, retries, rate limits, timeouts)"""
+        return get_http_client()
+
+    def http_get(self, url, **kwargs):
+        return self.http.get(url, ats_type=self.ATS_TYPE, **kwargs)
+
+    def http_post(self, url, **kwargs):
+        return self.http.post(url, ats_type=self.ATS_TYPE, **kwargs)
+
+    def conditional_get(self, url, **kwargs):
+        """
+        GET with ETag / Last-Modified validators from the response cache.
+        Returns None when the board is unchanged since the last scan (304 or same body hash)
+        and every job it had is already in jobs.db.
+        Call remember_response() once the body was parsed, so the next scan can skip it.
+        """
+        cache = get_response_cache()
+        headers = dict(kwargs.pop('headers', None) or {})
+        trusted = cache.covered_by(url, self.known_ids, self.filter_key)
+        if trusted:
+            headers.update(cache.conditional_headers(url))
+        response = self.http_get(url, headers=headers, **kwargs)
+        if trusted and cache.is_unchanged(url, response):
+            return None
+        return response
+
+    def remember_response(self, url, response, jobs):
+        kept = [job['id'] for job in jobs if self.job_filter is None or self.job_filter(job)]
+        get_response_cache().store(url, response, kept, self.filter_key)
@@ -0,0 +1,185 @@
+# ==============================================================================
+# Handles the shared headless browser (generic rendered targets + Workday handshakes)
+# One Chromium per process, started lazily on its own event-loop thread.
+# Every caller gets a fresh context, so several sites load in parallel, and
+# images / fonts / media are never downloaded
+# ==============================================================================
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+import time
+
+BROWSER_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled"]
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+HIDE_WEBDRIVER = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+BLOCKED_RESOURCES = {"image", "font", "media"}
+# Contexts (= pages) open at once, BROWSER_CONTEXTS overrides
+MAX_CONTEXTS = 4
+# Longest a page may take once it has a context slot (launch + navigation + the caller's work), seconds
+PAGE_TIMEOUT = 180
+# Safety net for callers waiting on the browser loop itself, queueing for a slot included
+RESULT_TIMEOUT = 15 * 60
+
+class NetworkActivity:
+    """Counts the page's in-flight requests, so callers can wait for the network to go quiet"""
+    def __init__(self, page):
+        self.in_flight = 0
+        self.last_change = time.monotonic()
+        page.on("request", self._started)
+        page.on("requestfinished", self._ended)
+        page.on("requestfailed", self._ended)
+
+    def _started(self, _request):
+        self.in_flight += 1
+        self.last_change = time.monotonic()
+
+    def _ended(self, _request):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.last_change = time.monotonic()
+
+    async def idle(self, quiet_ms=500, timeout_ms=5000):
+        """True once no request has been in flight for quiet_ms, False on timeout"""
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            if self.in_flight == 0 and time.monotonic() - self.last_change >= quiet_ms / 1000:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+class BrowserService:
+    def __init__(self, max_contexts=None):
+        self.max_contexts = max_contexts or int(os.environ.get("BROWSER_CONTEXTS", MAX_CONTEXTS))
+        self.loop = None
+        self.thread = None
+        self.playwright = None
+        self.browser = None
+        self.slots = asyncio.Semaphore(self.max_contexts)
+        self.launch_lock = asyncio.Lock()
+        self.lock = threading.Lock()
+
+    def _start_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name="browser-loop", daemon=True)
+                self.thread.start()
+
+    def run(self, coro, timeout=None):
+        """
+        Runs a coroutine on the browser loop from any thread and waits for its result.
+        After `timeout` seconds the coroutine is cancelled and TimeoutError raised.
+        """
+        self._start_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Done: the coroutine itself raised a TimeoutError, pass it on as it is
+            if future.done():
+                raise
+            future.cancel()
+            raise TimeoutError(f"browser work did not finish within {timeout}s") from None
+
+    async def _browser(self):
+        async with self.launch_lock:
+            # Chromium crashed or was killed: launch a new one instead of failing every later page
+            if self.browser is not None and not self.browser.is_connected():
+                print("[!] Shared browser disconnected, relaunching.")
+                self.browser = None
+            if self.browser is None:
+                if self.playwright is None:
+                    from playwright.async_api import async_playwright
+                    self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        return self.browser
+
+    async def _new_context(self, block_resources):
+        browser = await self._browser()
+        context = await browser.new_context(user_agent=USER_AGENT)
+        await context.add_init_script(HIDE_WEBDRIVER)
+        if block_resources:
+            async def block(route):
+                if route.request.resource_type in BLOCKED_RESOURCES:
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await context.route("**/*", block)
+        return context
+
+    async def _page_work(self, work, block_resources):
+        context = await self._new_context(block_resources)
+        try:
+            page = await context.new_page()
+            return await work(page, NetworkActivity(page))
+        finally:
+            await context.close()
+
+    async def _with_page(self, work, block_resources, timeout):
+        async with self.slots:
+            # A hung page gives its slot back instead of holding it for the life of the process
+            try:
+                return await asyncio.wait_for(self._page_work(work, block_resources), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"browser page did not finish within {timeout}s") from None
+
+    def with_page(self, work, block_resources=True, timeout=PAGE_TIMEOUT):
+        """
+        Runs `async work(page, network)` on a fresh page of the shared browser and returns its result.
+        Waits for a free context slot, so any number of threads can call it at once.
+        Raises TimeoutError if the page takes longer than `timeout` seconds once it has a slot.
+        """
+        return self.run(self._with_page(work, block_resources, timeout), RESULT_TIMEOUT)
+
+    def handshake(self, url, ready_url=None, timeout_ms=25000):
+        """
+        Loads url in a new context and returns its cookies (Playwright dicts).
+        ready_url: substring of a request the page makes once it is usable, waited for instead of a fixed sleep.
+        Raises TimeoutError if the whole handshake takes longer than the navigation and idle waits allow.
+        """
+        async def work(page, network):
+            if ready_url:
+                # The site's own API call answering means the session cookies are set
+                from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+                try:
+                    async with page.expect_response(lambda r: ready_url in r.url, timeout=timeout_ms):
+                        await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                except PlaywrightTimeoutError:
+                    # Page loaded but never called its API, keep whatever cookies it set
+                    pass
+            else:
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                await network.idle(timeout_ms=timeout_ms)
+            return await page.context.cookies()
+        # Navigation plus the ready / idle wait, and a margin for the browser launch
+        return self.with_page(work, timeout=2 * timeout_ms / 1000 + 30)
+
+    async def _close(self):
+        if self.browser is not None:
+            await self.browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+        self.browser = self.playwright = None
+
+    def close(self):
+        if self.loop is None:
+            return
+        try:
+            self.run(self._close(), timeout=10)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+_browser_service = None
+_service_lock = threading.Lock()
+
+def get_browser_service():
+    """The process-wide BrowserService, closed on exit"""
+    global _browser_service
+    with _service_lock:
+        if _browser_service is None:
+            _browser_service = BrowserService()
+            atexit.register(_browser_service.close)
+        return _browser_service
@@ -1,10 +1,10 @@
-import requests
 import re
-import json
-import html
-from .base import BaseFetcher
+from .base import BaseFetcher, FetchError
 
 class ComeetFetcher(BaseFetcher):
+    HOST = "www.comeet.co"
+    ATS_TYPE = "comeet"
+
     def fetch(self, target_config):
         print(f"[*] Fetching jobs for {target_config['name']} (Comeet)...")
         
@@ -16,7 +16,7 @@ class ComeetFetcher(BaseFetcher):
                 "Referer": base_url
             }
             
-            response = requests.get(base_url, headers=headers)
+            response = self.http_get(base_url, headers=headers)
             if response.status_code != 200:
                 print(f"    [!] Error loading page: {response.status_code}")
                 return []
@@ -60,15 +60,18 @@ class ComeetFetcher(BaseFetcher):
 
             if not token:
                 print(f"    [!] FAILED to find token for {target_config['name']}. Skipping.")
-                return []
+                raise FetchError("no token")
 
             # 2. Hit the API
             api_url = f"https://www.comeet.co/careers-api/2.0/company/{target_config['comeet_uid']}/positions?token={token}&details=true"
             
-            api_response = requests.get(api_url, headers=headers)
+            api_response = self.conditional_get(api_url, headers=headers)
+            if api_response is None:
+                print(f"    -> Board unchanged since last scan. Skipping.")
+                return []
             if api_response.status_code != 200:
                 print(f"    [!] API Error: {api_response.status_code}")
-                return []
+                raise FetchError(api_response.status_code)
                 
             data = api_response.json()
             batch = data if isinstance(data, list) else data.get('positions', [])
@@ -115,19 +118,22 @@ class ComeetFetcher(BaseFetcher):
                     "description": desc
                 }
                 all_jobs.append(job_obj)
-                
+
+            self.remember_response(api_url, api_response, all_jobs)
             return all_jobs
 
+        except FetchError:
+            raise
         except Exception as e:
             print(f"[!] Crash fetching {target_config['name']}: {e}")
-            return []
+            raise FetchError(e) from e
 
     def _verify_token(self, token, uid, headers):
         """Helper to test a guessed token"""
         try:
             # Request just 1 job to see if token is valid
             test_url = f"https://www.comeet.co/careers-api/2.0/company/{uid}/positions?token={token}&limit=1"
-            r = requests.get(test_url, headers=headers)
+            r = self.http_get(test_url, headers=headers)
             return r.status_code == 200
         except:
             return False
\ No newline at end of file
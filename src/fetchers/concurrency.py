@@ -0,0 +1,65 @@
+# ==============================================================================
+# Handles running many fetch targets at once on an asyncio loop
+# Global concurrency limit + per-host limit so one ATS never gets hammered
+# ==============================================================================
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .base import FetchError
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_PER_HOST_LIMIT = 4
+
+class AsyncFetchEngine:
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host_limit=DEFAULT_PER_HOST_LIMIT):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+
+    async def _run_one(self, fetcher, target_config, on_result, on_stats, global_sem, host_sems, stop):
+        host = fetcher.get_host(target_config)
+        if host not in host_sems:
+            host_sems[host] = asyncio.Semaphore(self.per_host_limit)
+
+        jobs = []
+        error = False
+        async with global_sem, host_sems[host]:
+            # Cancelled scan: targets still waiting for a slot are skipped
+            if stop is not None and stop.is_set():
+                return 0
+            start = time.perf_counter()
+            try:
+                jobs = await fetcher.fetch_async(target_config) or []
+            except FetchError:
+                error = True
+            except Exception as e:
+                error = True
+                print(f"[!] Async fetch error for {target_config.get('name')}: {e}")
+            elapsed = time.perf_counter() - start
+
+        if on_stats:
+            on_stats(target_config, elapsed, error)
+
+        # Results are handed over as soon as each target finishes
+        on_result(target_config, jobs)
+        return len(jobs)
+
+    async def run(self, work, on_result, on_stats=None, stop=None):
+        """
+        work: list of (fetcher, target_config) pairs
+        on_result: callback(target_config, jobs), called once per target
+        on_stats: optional callback(target_config, seconds, error), the fetch time without queueing
+        stop: optional threading.Event, targets that have not started yet are skipped once it is set
+        """
+        loop = asyncio.get_running_loop()
+        # to_thread() uses the default executor, make sure it is as wide as our limit
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrency))
+
+        global_sem = asyncio.Semaphore(self.max_concurrency)
+        host_sems = {}
+        tasks = [
+            self._run_one(fetcher, target, on_result, on_stats, global_sem, host_sems, stop)
+            for fetcher, target in work
+        ]
+        counts = await asyncio.gather(*tasks)
+        return sum(counts)
@@ -1,11 +1,20 @@
-import time
+import json
 from typing import Dict, List
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse, urljoin
-import requests
-from bs4 import BeautifulSoup
-from src.fetchers.base import BaseFetcher
+from src.fetchers.base import BaseFetcher, FetchError
+from src.fetchers.browser import get_browser_service
+from src.fetchers.pagination import paginate, DEFAULT_WINDOW
+from src.fetchers.listing_parser import ListingParser, READ_ROWS
+from src.fetchers.api_capture import endpoint_store, ENDPOINT_TTL, map_items, describe_request
+
+# [row count, first row text] of a rendered listing, compared to see when it changes
+ROWS_SNAPSHOT = "sel => { const r = document.querySelectorAll(sel); return [r.length, r.length ? (r[0].innerText || '') : '']; }"
+ROWS_CHANGED = "([sel, count, first]) => { const r = document.querySelectorAll(sel); return r.length > 0 && (r.length !== count || (r[0].innerText || '') !== first); }"
+ROWS_GREW = "([sel, count]) => document.querySelectorAll(sel).length > count"
 
 class GenericHTMLFetcher(BaseFetcher):
+    ATS_TYPE = "generic"
+
     def fetch(self, target_config: Dict) -> List[Dict]:
         name = target_config.get("name", "Unknown")
         render = target_config.get("render", False)
@@ -13,15 +22,111 @@ class GenericHTMLFetcher(BaseFetcher):
 
         if not render:
             return self._fetch_requests(target_config)
+        elif target_config.get("api"):
+            return self._fetch_api(target_config)
         else:
             return self._fetch_selenium(target_config)
 
+    def _fetch_api(self, target_config: Dict) -> List[Dict]:
+        """Rendered target with an "api" mapping: the listing's JSON endpoint, the browser only to find it"""
+        name = target_config.get("name", "Unknown")
+        key = target_config["url"]
+
+        entry = endpoint_store.get(key, ENDPOINT_TTL)
+        if entry:
+            jobs = self._call_endpoint(target_config, entry["endpoint"])
+            if jobs:
+                return jobs
+            print(f"    [*] {name}: saved API endpoint stopped working, capturing again...")
+            endpoint_store.pop(key)
+
+        captured = get_browser_service().with_page(
+            lambda page, network: self._capture_endpoint(page, network, target_config)
+        )
+        if not captured:
+            print(f"    [*] {name}: no JSON listing response matched, parsing the page instead.")
+            return self._fetch_selenium(target_config)
+
+        endpoint, payload = captured
+        jobs = self._call_endpoint(target_config, endpoint)
+        if jobs:
+            print(f"    [*] {name}: API endpoint captured, next runs skip the browser.")
+            endpoint_store.put(key, endpoint=endpoint)
+            return jobs
+        # Endpoint only works inside the browser session, use what the page received
+        return map_items(payload, target_config)
+
+    def _call_endpoint(self, target_config: Dict, endpoint: Dict) -> List[Dict]:
+        """Jobs from a captured endpoint over plain HTTP, following api.pagination if configured"""
+        name = target_config.get("name", "Unknown")
+        pagination = target_config["api"].get("pagination", {})
+        param = pagination.get("param")
+        start_val = pagination.get("start", 0)
+        step = pagination.get("step", 10)
+        max_pages = pagination.get("max_pages", 5) if param else 1
+
+        jobs = []
+        seen_ids = set()
+        for page_idx in range(max_pages):
+            url, body = endpoint["url"], endpoint.get("post_data")
+            try:
+                if param:
+                    offset = start_val + (page_idx * step)
+                    if body:
+                        body = json.dumps(dict(json.loads(body), **{param: offset}))
+                    else:
+                        url = self._set_query_param(url, param, offset)
+
+                resp = self.http.request(endpoint["method"], url, ats_type=self.ATS_TYPE,
+                                         headers=endpoint.get("headers"), data=body)
+                if resp.status_code != 200: break
+
+                new_jobs = [j for j in map_items(resp.json(), target_config) if j["id"] not in seen_ids]
+                if not new_jobs: break
+
+                for j in new_jobs: seen_ids.add(j["id"])
+                jobs.extend(new_jobs)
+            except Exception as e:
+                print(f"    [!] {name} API Error: {e}")
+                break
+        return jobs
+
+    async def _capture_endpoint(self, page, network, target_config: Dict):
+        """(endpoint, payload) of the first JSON response during navigation that maps to jobs, or None"""
+        match = target_config["api"].get("match", "")
+        responses = []
+
+        def record(response):
+            if (match in response.url and response.request.resource_type in ("xhr", "fetch")
+                    and "json" in response.headers.get("content-type", "")):
+                responses.append(response)
+
+        page.on("response", record)
+        try:
+            await page.goto(target_config["url"], wait_until="domcontentloaded", timeout=30000)
+            if target_config.get("row_selector"):
+                try:
+                    await page.wait_for_selector(target_config["row_selector"], timeout=15000)
+                except Exception:
+                    pass
+            await network.idle(timeout_ms=10000)
+        except Exception as e:
+            print(f"    [!] Browser error for {target_config.get('name', 'Unknown')}: {e}")
+
+        for response in responses:
+            try:
+                payload = await response.json()
+            except Exception:
+                continue
+            if map_items(payload, target_config):
+                return describe_request(response.request), payload
+        return None
+
     def _fetch_requests(self, target_config: Dict) -> List[Dict]:
         name = target_config.get("name", "Unknown")
         url = target_config["url"]
         pagination = target_config.get("pagination", {})
         
-        session = requests.Session()
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -32,20 +137,27 @@ class GenericHTMLFetcher(BaseFetcher):
         step = pagination.get("step", 10)
         max_pages = pagination.get("max_pages", 5)
         
+        # Pages fetched at once; the first page without new jobs ends the scan
+        window = pagination.get("window", DEFAULT_WINDOW)
+        offsets = [start_val + (page_idx * step) for page_idx in range(max_pages)]
+        
         jobs = []
         seen_ids = set()
+        parser = ListingParser(target_config, name)
 
-        # 
-        for page_idx in range(max_pages):
-            offset = start_val + (page_idx * step)
-            page_url = self._set_query_param(url, param, offset)
-            
-            try:
-                resp = session.get(page_url, headers=headers, timeout=20)
-                if resp.status_code != 200: break
-                
-                soup = BeautifulSoup(resp.text, "html.parser")
-                page_jobs = self._parse_jobs(soup, target_config, name, resp.url)
+        def fetch_page(offset):
+            resp = self.http_get(self._set_query_param(url, param, offset), headers=headers)
+            if resp.status_code != 200:
+                # Past the last page some sites answer 404, only the first page failing is an error
+                if offset == start_val:
+                    print(f"    [!] {name} Error: {resp.status_code}")
+                    raise FetchError(resp.status_code)
+                return None
+            return parser.parse(resp.text, resp.url)
+
+        try:
+            for offset, page_jobs in paginate(offsets, fetch_page, window):
+                if page_jobs is None: break
                 
                 new_jobs = [j for j in page_jobs if j["id"] not in seen_ids]
                 if not new_jobs: break
@@ -54,156 +166,132 @@ class GenericHTMLFetcher(BaseFetcher):
                 jobs.extend(new_jobs)
                 
                 print(f"    -> {name} Index {offset}: Found {len(new_jobs)} NEW jobs.")
-                time.sleep(1)
-            except Exception as e:
-                print(f"    [!] Error: {e}")
-                break
+
+                # Newest first: a page of stored jobs means the rest are stored too
+                if all(self.is_known(j["id"]) for j in new_jobs):
+                    print(f"    -> {name}: Index {offset} is all known jobs. Done.")
+                    break
+        except FetchError:
+            raise
+        except Exception as e:
+            print(f"    [!] Error: {e}")
+            if not jobs: raise FetchError(e) from e
                 
         return jobs
 
     def _fetch_selenium(self, target_config: Dict) -> List[Dict]:
+        # A page of the shared browser, other rendered targets load at the same time
+        return get_browser_service().with_page(
+            lambda page, network: self._scrape_rendered(page, network, target_config)
+        )
+
+    async def _rows_snapshot(self, page, row_sel):
+        return await page.evaluate(ROWS_SNAPSHOT, row_sel)
+
+    async def _wait_rows(self, page, script, row_sel, snapshot, timeout):
+        """Waits until the rows changed/grew compared to snapshot. False on timeout"""
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        try:
+            await page.wait_for_function(script, arg=[row_sel] + snapshot, timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def _scrape_rendered(self, page, network, target_config: Dict) -> List[Dict]:
         name = target_config.get("name", "Unknown")
         url = target_config["url"]
+        row_sel = target_config['row_selector']
         pagination = target_config.get("pagination", {})
         pagination_type = pagination.get("type", "next_button")
 
-        from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
         jobs = []
         seen_ids = set()
+        parser = ListingParser(target_config, name)
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled"]
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-            )
-            page = context.new_page()
-            page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-
-                if pagination_type == "scroll":
-                    max_scrolls = pagination.get("max_scrolls", 15)
-                    stable_rounds = pagination.get("stable_rounds", 3)
-                    sleep_after_scroll = pagination.get("sleep_after_scroll", 1.5)
-                    stable_count = 0
-
-                    for scroll_idx in range(max_scrolls):
-                        try:
-                            page.wait_for_selector(target_config['row_selector'], timeout=10000)
-                        except PlaywrightTimeoutError:
-                            break
+        async def collect():
+            # Rows are read in the page itself; new ones are told apart by job id, not by DOM node
+            links = await page.evaluate(READ_ROWS, [row_sel, target_config.get("title_selector"),
+                                                    target_config.get("container_selector")])
+            page_jobs = parser.from_links(links, page.url)
+            new_jobs = [j for j in page_jobs if j["id"] not in seen_ids]
+            for j in new_jobs:
+                seen_ids.add(j["id"])
+            jobs.extend(new_jobs)
+            return new_jobs
 
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-                        time.sleep(0.5)
-
-                        soup = BeautifulSoup(page.content(), "html.parser")
-                        page_jobs = self._parse_jobs(soup, target_config, name, page.url)
-                        new_jobs = [j for j in page_jobs if j["id"] not in seen_ids]
-
-                        if not new_jobs:
-                            stable_count += 1
-                            if stable_count >= stable_rounds:
-                                print(f"    -> {name}: No new jobs for {stable_rounds} rounds. Done.")
-                                break
-                        else:
-                            stable_count = 0
-                            for j in new_jobs:
-                                seen_ids.add(j["id"])
-                            jobs.extend(new_jobs)
-                            print(f"    -> {name} Scroll {scroll_idx + 1}: Found {len(new_jobs)} NEW jobs.")
-
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        time.sleep(sleep_after_scroll)
-
-                else:
-                    max_pages = pagination.get("max_pages", 4)
-                    next_sel = target_config.get("next_button_selector")
-                    page_count = 1
-
-                    while page_count <= max_pages:
-                        try:
-                            page.wait_for_selector(target_config['row_selector'], timeout=15000)
-                        except PlaywrightTimeoutError:
-                            break
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
 
-                        page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-                        time.sleep(3)
+            if pagination_type == "scroll":
+                max_scrolls = pagination.get("max_scrolls", 15)
+                stable_rounds = pagination.get("stable_rounds", 3)
+                # Longest wait for more rows after a scroll (ms)
+                settle_timeout = int(pagination.get("sleep_after_scroll", 1.5) * 2000)
+                stable_count = 0
 
-                        soup = BeautifulSoup(page.content(), "html.parser")
-                        page_jobs = self._parse_jobs(soup, target_config, name, page.url)
-                        new_jobs = [j for j in page_jobs if j["id"] not in seen_ids]
-                        if not new_jobs:
-                            break
+                for scroll_idx in range(max_scrolls):
+                    try:
+                        await page.wait_for_selector(row_sel, timeout=10000)
+                    except PlaywrightTimeoutError:
+                        break
 
-                        for j in new_jobs:
-                            seen_ids.add(j["id"])
-                        jobs.extend(new_jobs)
-                        print(f"    -> {name} Page {page_count}: Found {len(new_jobs)} NEW jobs.")
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
+                    await network.idle(timeout_ms=2000)
 
-                        if not next_sel:
-                            break
-                        try:
-                            btn = page.query_selector(next_sel)
-                            if btn is None:
-                                break
-                            btn.scroll_into_view_if_needed()
-                            time.sleep(1)
-                            btn.click()
-                            page_count += 1
-                            time.sleep(4)
-                        except Exception:
+                    new_jobs = await collect()
+                    if not new_jobs:
+                        stable_count += 1
+                        if stable_count >= stable_rounds:
+                            print(f"    -> {name}: No new jobs for {stable_rounds} rounds. Done.")
                             break
+                    else:
+                        stable_count = 0
+                        print(f"    -> {name} Scroll {scroll_idx + 1}: Found {len(new_jobs)} NEW jobs.")
 
-            except Exception as e:
-                print(f"    [!] Browser error for {name}: {e}")
-            finally:
-                browser.close()
+                    snapshot = await self._rows_snapshot(page, row_sel)
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    await self._wait_rows(page, ROWS_GREW, row_sel, snapshot, settle_timeout)
 
-        return jobs
+            else:
+                max_pages = pagination.get("max_pages", 4)
+                next_sel = target_config.get("next_button_selector")
+                page_count = 1
 
-    def _parse_jobs(self, soup: BeautifulSoup, config: Dict, company: str, base_url: str) -> List[Dict]:
-        jobs = []
-        rows = soup.select(config.get("row_selector", ""))
-        
-        # If row selector fails, fallback to all links (Check Point needs this)
-        items = rows if rows else soup.select("a[href]")
+                while page_count <= max_pages:
+                    try:
+                        await page.wait_for_selector(row_sel, timeout=15000)
+                    except PlaywrightTimeoutError:
+                        break
 
-        includes = config.get("href_include", [])
-        # Hardcode social excludes so they never show up again
-        excludes = config.get("href_exclude", []) + ["mailto:", "twitter.com", "linkedin.com", "facebook.com", "share"]
-        
-        for item in items:
-            title_sel = config.get("title_selector")
-            t_el = item.select_one(title_sel) if title_sel and item.name != 'a' else item
-            
-            if item.name == 'a':
-                link = item.get("href", "")
-            else:
-                l_el = item.select_one("a[href]")
-                link = l_el.get("href", "") if l_el else ""
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
+                    await network.idle(timeout_ms=3000)
 
-            if not link: continue
-            
-            link_lower = link.lower()
-            if any(x in link_lower for x in excludes): continue
-            if includes and not any(x in link_lower for x in includes): continue
+                    new_jobs = await collect()
+                    if not new_jobs:
+                        break
+                    print(f"    -> {name} Page {page_count}: Found {len(new_jobs)} NEW jobs.")
 
-            title = t_el.get_text(" ", strip=True) if t_el else ""
-            if not title or len(title) < 4: continue
+                    if not next_sel:
+                        break
+                    try:
+                        btn = await page.query_selector(next_sel)
+                        if btn is None:
+                            break
+                        snapshot = await self._rows_snapshot(page, row_sel)
+                        await btn.scroll_into_view_if_needed()
+                        await btn.click()
+                        page_count += 1
+                        # Next page is ready once the row list is replaced (same-page or full navigation)
+                        await self._wait_rows(page, ROWS_CHANGED, row_sel, snapshot, 15000)
+                    except Exception:
+                        break
+
+        except Exception as e:
+            print(f"    [!] Browser error for {name}: {e}")
+            if not jobs: raise FetchError(e) from e
 
-            if not link.startswith("http"):
-                link = urljoin(base_url, link)
-                
-            jobs.append({
-                "company": company, "title": title, "location": config.get("location", "Israel"),
-                "url": link, "id": link, "posted_on": "Recent"
-            })
-            
         return jobs
 
     def _set_query_param(self, url: str, param: str, value: int) -> str:
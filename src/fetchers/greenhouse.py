@@ -1,8 +1,9 @@
-import requests
-import time
-from .base import BaseFetcher
+from .base import BaseFetcher, FetchError
 
 class GreenhouseFetcher(BaseFetcher):
+    HOST = "boards-api.greenhouse.io"
+    ATS_TYPE = "greenhouse"
+
     def fetch(self, target_config):
         print(f"[*] Fetching jobs for {target_config['name']} (Greenhouse)...")
         
@@ -10,11 +11,14 @@ class GreenhouseFetcher(BaseFetcher):
         all_jobs = []
         
         try:
-            response = requests.get(api_url)
+            response = self.conditional_get(api_url)
+            if response is None:
+                print(f"    -> Board unchanged since last scan. Skipping.")
+                return []
             
             if response.status_code != 200:
                 print(f"    [!] Error: {response.status_code}")
-                return []
+                raise FetchError(response.status_code)
                 
             data = response.json()
             batch = data.get('jobs', [])
@@ -61,8 +65,13 @@ class GreenhouseFetcher(BaseFetcher):
                 }
                 
                 all_jobs.append(job_obj)
+
+            self.remember_response(api_url, response, all_jobs)
                 
+        except FetchError:
+            raise
         except Exception as e:
             print(f"[!] Crash fetching {target_config['name']}: {e}")
+            raise FetchError(e) from e
             
         return all_jobs
\ No newline at end of file
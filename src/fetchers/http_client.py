@@ -0,0 +1,172 @@
+# ==============================================================================
+# Handles the shared HTTP client used by every fetcher
+# Pooled keep-alive connections, bounded retries and per-ATS rate limits
+# ==============================================================================
+
+import json
+import os
+import random
+import threading
+import time
+import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) seconds - no request may hang forever
+DEFAULT_TIMEOUT = (5, 20)
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Token bucket per ATS type: rate = requests per second, burst = bucket size
+# Can be overridden with config/rate_limits.json, e.g. {"greenhouse": {"rate": 5, "burst": 10}}
+RATE_LIMITS = {
+    "default": {"rate": 5, "burst": 10},
+    "greenhouse": {"rate": 8, "burst": 16},
+    "lever": {"rate": 5, "burst": 10},
+    "comeet": {"rate": 3, "burst": 6},
+    "smartrecruiters": {"rate": 2, "burst": 4},
+    "workday": {"rate": 6, "burst": 12},
+    "generic": {"rate": 1, "burst": 2},
+}
+RATE_LIMITS_PATH = os.path.join('config', 'rate_limits.json')
+# ATS types whose limit applies to every host on its own: each generic target is a different
+# company site, so one shared bucket would make them all wait on each other
+PER_HOST_LIMITS = {"generic"}
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, pool_size=10):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limits = self._load_rate_limits()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.pool_size = pool_size
+
+        # One session = one connection pool per host, reused between requests (keep-alive)
+        self.session = self.new_session()
+
+    def new_session(self):
+        """Pooled session for callers that need their own cookie jar (e.g. Workday tenants)"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=50, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _load_rate_limits(self):
+        limits = {k: dict(v) for k, v in RATE_LIMITS.items()}
+        if os.path.exists(RATE_LIMITS_PATH):
+            try:
+                with open(RATE_LIMITS_PATH, 'r') as f:
+                    for ats_type, values in json.load(f).items():
+                        limits.setdefault(ats_type, dict(limits["default"])).update(values)
+            except Exception as e:
+                print(f"[!] Error reading {RATE_LIMITS_PATH}: {e}")
+        return limits
+
+    def bucket_for(self, ats_type, host=None):
+        """Token bucket of an ATS type, one per host for the types in PER_HOST_LIMITS"""
+        key = (ats_type, host) if ats_type in PER_HOST_LIMITS else ats_type
+        with self._lock:
+            if key not in self._buckets:
+                limit = self.rate_limits.get(ats_type, self.rate_limits["default"])
+                self._buckets[key] = TokenBucket(limit["rate"], limit["burst"])
+            return self._buckets[key]
+
+    def _retry_after(self, response):
+        """Seconds to wait according to the Retry-After header (None if missing)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(float(value), MAX_BACKOFF)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            delta = (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+            return min(max(delta, 0), MAX_BACKOFF)
+        except Exception:
+            return None
+
+    def _backoff(self, attempt):
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * (2 ** attempt)))
+
+    def request(self, method, url, ats_type="default", session=None, **kwargs):
+        """
+        Sends a request through the rate limiter with retries.
+        session: optional requests.Session to use instead of the shared one (e.g. Workday cookies).
+        Returns the last response, raises only if every attempt failed at the network level.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        session = session or self.session
+        host = urlparse(url).hostname
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket_for(ats_type, host).acquire()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"    [!] {host}: {type(e).__name__}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                print(f"    [!] {host}: HTTP {response.status_code}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            return response
+
+    def get(self, url, ats_type="default", **kwargs):
+        return self.request("GET", url, ats_type=ats_type, **kwargs)
+
+    def post(self, url, ats_type="default", **kwargs):
+        return self.request("POST", url, ats_type=ats_type, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Returns the process-wide HttpClient (created on first use)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -1,61 +1,148 @@
+import multiprocessing
+import re
+import time
+from collections import deque
+from multiprocessing.connection import wait
 import pandas as pd
 from jobspy import scrape_jobs
 from .base import BaseFetcher
 
+# Searches at once (one process each) and the time one search may take, counted from its start
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 180
+# How often a cancellable run checks its stop Event while searches are running
+STOP_POLL = 1
+
+# Filter: Ensure strictly Israel
+ISRAEL_LOCATIONS = ["israel", "tel aviv", "haifa"]
+ISRAEL_RE = "|".join(map(re.escape, ISRAEL_LOCATIONS))
+
+def _column(jobs_df, name, default=None):
+    return jobs_df[name] if name in jobs_df else pd.Series(default, index=jobs_df.index, dtype=object)
+
+def frame_to_jobs(jobs_df):
+    """JobSpy DataFrame -> job dicts, whole columns at a time instead of row by row"""
+    loc = _column(jobs_df, 'location', "").fillna("").astype(str)
+    jobs_df = jobs_df[loc.str.lower().str.contains(ISRAEL_RE, regex=True)]
+    if jobs_df.empty:
+        return []
+
+    # Clean up the ID
+    ids = _column(jobs_df, 'id')
+    ids = ids.where(ids.notna() & (ids.astype(str) != ""), _column(jobs_df, 'job_url'))
+
+    out = pd.DataFrame({
+        "company": _column(jobs_df, 'company'),
+        "title": _column(jobs_df, 'title'),
+        "location": _column(jobs_df, 'location'),
+        "posted_on": _column(jobs_df, 'date_posted').astype(str),
+        "url": _column(jobs_df, 'job_url'),
+        "id": ids.astype(str),
+        # Markdown is much cleaner for the AI to read!
+        "description": _column(jobs_df, 'description').fillna("Check Link for details")
+    })
+    # NaN -> None so SQLite stores NULL
+    return out.astype(object).where(out.notna(), None).to_dict("records")
+
+def run_search(target_config):
+    """One JobSpy search. Module-level so it can run in a worker process"""
+    print(f"[*] Running JobSpy: '{target_config['search_term']}' on {target_config.get('sites', ['linkedin'])}...")
+
+    # Map our config types to JobSpy's expected types
+    # job_type options: "fulltime", "parttime", "internship", "contract"
+    j_type = target_config.get('job_type', None)
+
+    try:
+        jobs_df = scrape_jobs(
+            site_name=target_config.get('sites', ["linkedin"]), # Support multiple sites!
+            search_term=target_config['search_term'],
+            location=target_config.get('location', 'Israel'),
+            results_wanted=target_config.get('limit', 20),
+            hours_old=24,
+            job_type=j_type,            # <--- THE MAGIC FILTER
+            description_format="markdown", # <--- SAVES AI TOKENS
+            country_macosx=False
+        )
+
+        if jobs_df.empty:
+            print("    -> No jobs found.")
+            return []
+
+        print(f"    -> Scanned {len(jobs_df)} listings")
+        all_jobs = frame_to_jobs(jobs_df)
+        print(f"    -> Kept {len(all_jobs)} valid Israeli jobs")
+        return all_jobs
+
+    except Exception as e:
+        print(f"[!] JobSpy Error: {e}")
+        return []
+
+def search_worker(target_config, conn):
+    """Process entry point: sends (jobs, seconds) of one search back through conn"""
+    start = time.perf_counter()
+    jobs = run_search(target_config)
+    conn.send((jobs, time.perf_counter() - start))
+    conn.close()
+
 class JobSpyFetcher(BaseFetcher):
+    HOST = "jobspy"
+
     def fetch(self, target_config):
-        print(f"[*] Running JobSpy: '{target_config['search_term']}' on {target_config.get('sites', ['linkedin'])}...")
-        
-        # Map our config types to JobSpy's expected types
-        # job_type options: "fulltime", "parttime", "internship", "contract"
-        j_type = target_config.get('job_type', None) 
-        
+        return run_search(target_config)
+
+    def fetch_many(self, targets, on_result, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, on_stats=None, stop=None):
+        """
+        Runs every search in its own process (up to max_workers at once), so pandas/scraping never competes
+        with the ATS fetchers. on_result(target_config, jobs) is called as each search finishes,
+        on_stats(target_config, seconds, error) with its run time when given.
+        A search still running `timeout` seconds after it started is killed; the others keep their time.
+        Once the optional stop Event is set, running searches are killed and the rest are skipped.
+        """
+        # spawn: forking a process that runs fetch threads and a browser loop can deadlock
+        ctx = multiprocessing.get_context("spawn")
+        pending = deque(targets)
+        running = {}  # result pipe -> (process, target, deadline)
         try:
-            jobs_df = scrape_jobs(
-                site_name=target_config.get('sites', ["linkedin"]), # Support multiple sites!
-                search_term=target_config['search_term'],
-                location=target_config.get('location', 'Israel'),
-                results_wanted=target_config.get('limit', 20),
-                hours_old=24,
-                job_type=j_type,            # <--- THE MAGIC FILTER
-                description_format="markdown", # <--- SAVES AI TOKENS
-                country_macosx=False
-            )
-            
-            if jobs_df.empty:
-                print("    -> No jobs found.")
-                return []
-
-            print(f"    -> Scanned {len(jobs_df)} listings")
-            
-            all_jobs = []
-            for index, row in jobs_df.iterrows():
-                # Filter: Ensure strictly Israel
-                loc = str(row.get('location', '')).lower()
-                if "israel" not in loc and "tel aviv" not in loc and "haifa" not in loc:
-                    continue
-
-                # Clean up the ID
-                job_id = row.get('id')
-                if not job_id or pd.isna(job_id):
-                    job_id = row.get('job_url')
-
-                job_obj = {
-                    "company": row.get('company'),
-                    "title": row.get('title'),
-                    "location": row.get('location'),
-                    "posted_on": str(row.get('date_posted')),
-                    "url": row.get('job_url'),
-                    "id": str(job_id),
-                    # Markdown is much cleaner for the AI to read!
-                    "description": row.get('description', "Check Link for details")
-                }
-                
-                all_jobs.append(job_obj)
-            
-            print(f"    -> Kept {len(all_jobs)} valid Israeli jobs")
-            return all_jobs
-
-        except Exception as e:
-            print(f"[!] JobSpy Error: {e}")
-            return []
\ No newline at end of file
+            while pending or running:
+                if stop is not None and stop.is_set():
+                    break
+                while pending and len(running) < max_workers:
+                    target = pending.popleft()
+                    receiver, sender = ctx.Pipe(duplex=False)
+                    process = ctx.Process(target=search_worker, args=(target, sender), daemon=True)
+                    process.start()
+                    sender.close()
+                    running[receiver] = (process, target, time.monotonic() + timeout)
+
+                next_deadline = min(deadline for _, _, deadline in running.values())
+                # With a stop Event, wake up every STOP_POLL seconds to check it
+                wait_for = next_deadline - time.monotonic()
+                if stop is not None:
+                    wait_for = min(wait_for, STOP_POLL)
+                for receiver in wait(list(running), timeout=max(0, wait_for)):
+                    process, target, _ = running.pop(receiver)
+                    try:
+                        jobs, seconds = receiver.recv()
+                        if on_stats: on_stats(target, seconds, False)
+                        on_result(target, jobs)
+                    except Exception as e:
+                        # EOFError: the process died before sending anything
+                        print(f"[!] JobSpy Error ({target.get('name')}): {e!r}")
+                        if on_stats: on_stats(target, None, True)
+                    finally:
+                        receiver.close()
+                        process.join()
+
+                now = time.monotonic()
+                for receiver, (process, target, deadline) in list(running.items()):
+                    if now >= deadline:
+                        print(f"[!] JobSpy timed out after {timeout}s: {target.get('name')}")
+                        del running[receiver]
+                        process.terminate()
+                        process.join()
+                        receiver.close()
+                        if on_stats: on_stats(target, None, True)
+        finally:
+            for receiver, (process, _, _) in running.items():
+                process.terminate()
+                receiver.close()
@@ -0,0 +1,51 @@
+# ==============================================================================
+# Handles small on-disk caches kept between runs (Workday sessions and facets,
+# captured API endpoints). One JSON file per cache, entries expire by age
+# ==============================================================================
+
+import json
+import os
+import threading
+import time
+
+class JsonStore:
+    """Small {key: entry} JSON file, loaded once, every entry stamped with "updated" """
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.data is None:
+            self.data = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        self.data = json.load(f)
+                except Exception as e:
+                    print(f"    [!] Error reading {self.path}: {e}")
+        return self.data
+
+    def _save(self):
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.data, f, indent=2)
+        except Exception as e:
+            print(f"    [!] Error writing {self.path}: {e}")
+
+    def get(self, key, max_age):
+        with self.lock:
+            entry = self._load().get(key)
+        if entry and time.time() - entry.get("updated", 0) < max_age:
+            return entry
+        return None
+
+    def put(self, key, **entry):
+        with self.lock:
+            self._load()[key] = dict(entry, updated=time.time())
+            self._save()
+
+    def pop(self, key):
+        with self.lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
@@ -1,8 +1,9 @@
-import requests
-import json
-from .base import BaseFetcher
+from .base import BaseFetcher, FetchError
 
 class LeverFetcher(BaseFetcher):
+    HOST = "api.lever.co"
+    ATS_TYPE = "lever"
+
     def fetch(self, target_config):
         print(f"[*] Fetching jobs for {target_config['name']} (Lever)...")
         
@@ -11,10 +12,13 @@ class LeverFetcher(BaseFetcher):
         
         all_jobs = []
         try:
-            response = requests.get(url)
+            response = self.conditional_get(url)
+            if response is None:
+                print(f"    -> Board unchanged since last scan. Skipping.")
+                return []
             if response.status_code != 200:
                 print(f"    [!] Error: {response.status_code}")
-                return []
+                raise FetchError(response.status_code)
             
             batch = response.json()
             
@@ -49,8 +53,13 @@ class LeverFetcher(BaseFetcher):
                     "description": job.get("descriptionPlain", "No description")
                 }
                 all_jobs.append(job_obj)
+
+            self.remember_response(url, response, all_jobs)
                 
+        except FetchError:
+            raise
         except Exception as e:
             print(f"[!] Crash fetching {target_config['name']}: {e}")
+            raise FetchError(e) from e
             
         return all_jobs
\ No newline at end of file
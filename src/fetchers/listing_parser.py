@@ -0,0 +1,146 @@
+# ==============================================================================
+# Handles turning generic listing pages into jobs
+# Selectors and include/exclude lists are compiled once per target. Static
+# pages use the fastest installed parser (selectolax > lxml > BeautifulSoup);
+# rendered pages are read in the browser itself. With a container_selector only
+# that element is searched for rows and links. Every backend joins a title's
+# text nodes with single spaces, so they all give the same jobs
+# ==============================================================================
+
+from urllib.parse import urljoin
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    BACKEND = "selectolax"
+except ImportError:
+    try:
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+        BACKEND = "lxml"
+    except ImportError:
+        import soupsieve
+        from bs4 import BeautifulSoup
+        BACKEND = "bs4"
+
+# Hardcode social excludes so they never show up again
+SOCIAL_EXCLUDES = ["mailto:", "twitter.com", "linkedin.com", "facebook.com", "share"]
+
+# [href, title] of every row on the page. Which ones are new is decided in Python by job id:
+# SPA pagination and virtualized lists reuse the same DOM nodes for other jobs.
+# Falls back to all links when row_selector matches nothing (Check Point needs this).
+# Both only look inside containerSel when it is given and found
+READ_ROWS = """([rowSel, titleSel, containerSel]) => {
+    const root = (containerSel && document.querySelector(containerSel)) || document;
+    let items = rowSel ? Array.from(root.querySelectorAll(rowSel)) : [];
+    if (!items.length) items = Array.from(root.querySelectorAll("a[href]"));
+    const text = el => {
+        const parts = [];
+        if (el) {
+            const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+            while (walker.nextNode()) parts.push(walker.currentNode.nodeValue);
+        }
+        return parts.join(" ").replace(/\\s+/g, " ").trim();
+    };
+    const out = [];
+    for (const item of items) {
+        const isLink = item.tagName === "A";
+        const titleEl = titleSel && !isLink ? item.querySelector(titleSel) : item;
+        const linkEl = isLink ? item : item.querySelector("a[href]");
+        out.push([linkEl ? linkEl.getAttribute("href") || "" : "", text(titleEl)]);
+    }
+    return out;
+}"""
+
+def join_text(parts):
+    """Text nodes -> one line, like get_text(" ", strip=True) with whitespace runs collapsed"""
+    return " ".join(" ".join(parts).split())
+
+class ListingParser:
+    def __init__(self, config, company):
+        self.company = company
+        self.location = config.get("location", "Israel")
+        self.row_sel = config.get("row_selector", "")
+        self.title_sel = config.get("title_selector")
+        # Element holding the listing; rows and the all-links fallback are only looked for inside it
+        self.container_sel = config.get("container_selector")
+        # Matched as given against the lowercased link, so lowercase patterns are the ones that match
+        self.includes = list(config.get("href_include", []))
+        self.excludes = config.get("href_exclude", []) + SOCIAL_EXCLUDES
+
+        if BACKEND == "lxml":
+            self.container_css = CSSSelector(self.container_sel) if self.container_sel else None
+            self.rows_css = CSSSelector(self.row_sel) if self.row_sel else None
+            self.title_css = CSSSelector(self.title_sel) if self.title_sel else None
+            self.link_css = CSSSelector("a[href]")
+        elif BACKEND == "bs4":
+            self.container_css = soupsieve.compile(self.container_sel) if self.container_sel else None
+            self.rows_css = soupsieve.compile(self.row_sel) if self.row_sel else None
+            self.title_css = soupsieve.compile(self.title_sel) if self.title_sel else None
+            self.link_css = soupsieve.compile("a[href]")
+
+    def parse(self, html, base_url):
+        """Jobs of an HTML page (of its listing container, when one is configured and found)"""
+        if not html or not html.strip():
+            return []
+        return self.from_links(getattr(self, f"_links_{BACKEND}")(html), base_url)
+
+    def from_links(self, links, base_url):
+        """Jobs from (href, title) pairs, after the include/exclude lists"""
+        jobs = []
+        for link, title in links:
+            if not link: continue
+
+            link_lower = link.lower()
+            if any(x in link_lower for x in self.excludes): continue
+            if self.includes and not any(x in link_lower for x in self.includes): continue
+
+            if not title or len(title) < 4: continue
+
+            if not link.startswith("http"):
+                link = urljoin(base_url, link)
+
+            jobs.append({
+                "company": self.company, "title": title, "location": self.location,
+                "url": link, "id": link, "posted_on": "Recent"
+            })
+        return jobs
+
+    def _links_selectolax(self, html):
+        tree = HTMLParser(html)
+        root = tree.css_first(self.container_sel) if self.container_sel else None
+        if root is None: root = tree
+        items = (root.css(self.row_sel) if self.row_sel else []) or root.css("a[href]")
+        for item in items:
+            is_link = item.tag == "a"
+            t_el = item.css_first(self.title_sel) if self.title_sel and not is_link else item
+            l_el = item if is_link else item.css_first("a[href]")
+            link = (l_el.attributes.get("href") or "") if l_el else ""
+            yield link, join_text([t_el.text(separator=" ")]) if t_el else ""
+
+    def _links_lxml(self, html):
+        tree = lxml.html.fromstring(html)
+        found = self.container_css(tree) if self.container_css is not None else []
+        root = found[0] if found else tree
+        items = (self.rows_css(root) if self.rows_css is not None else []) or self.link_css(root)
+        for item in items:
+            is_link = item.tag == "a"
+            if self.title_css is not None and not is_link:
+                found = self.title_css(item)
+                t_el = found[0] if found else None
+            else:
+                t_el = item
+            found = [item] if is_link else self.link_css(item)
+            link = found[0].get("href", "") if found else ""
+            yield link, join_text(t_el.itertext()) if t_el is not None else ""
+
+    def _links_bs4(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        root = self.container_css.select_one(soup) if self.container_css else None
+        if root is None: root = soup
+        items = (self.rows_css.select(root) if self.rows_css else []) or self.link_css.select(root)
+        for item in items:
+            is_link = item.name == "a"
+            t_el = self.title_css.select_one(item) if self.title_css and not is_link else item
+            l_el = item if is_link else self.link_css.select_one(item)
+            link = l_el.get("href", "") if l_el else ""
+            yield link, join_text([t_el.get_text(" ")]) if t_el else ""
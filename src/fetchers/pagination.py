@@ -0,0 +1,42 @@
+# ==============================================================================
+# Handles offset pagination with a window of pages in flight
+# Pages come back in order; stopping the loop requests no further pages and does
+# not wait for the ones in flight (their results are dropped)
+# ==============================================================================
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+DEFAULT_WINDOW = 3
+
+def paginate(pages, fetch_page, window=DEFAULT_WINDOW):
+    """
+    Yields (page, fetch_page(page)) in the order of `pages`, with up to `window` fetches running at once.
+    Breaking out of the loop sends no further page: a fetch that has not started yet is skipped,
+    one already sent cannot be recalled, so it finishes in the background and its result is dropped.
+    """
+    pages = iter(pages)
+    stop = threading.Event()
+
+    def fetch(page):
+        # The window is as wide as the pool, so this is checked as a worker picks the page up
+        if stop.is_set():
+            return None
+        return fetch_page(page)
+
+    pool = ThreadPoolExecutor(max_workers=window)
+    in_flight = deque((page, pool.submit(fetch, page)) for page in islice(pages, window))
+    try:
+        while in_flight:
+            page, future = in_flight.popleft()
+            result = future.result()
+            # Keep the window full while the caller handles this page
+            for next_page in islice(pages, 1):
+                in_flight.append((next_page, pool.submit(fetch, next_page)))
+            yield page, result
+    finally:
+        stop.set()
+        # Not waiting: the caller is done with this listing, pages in flight only cost their own thread
+        pool.shutdown(wait=False)
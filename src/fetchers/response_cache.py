@@ -0,0 +1,112 @@
+# ==============================================================================
+# Handles the persistent conditional-GET cache for ATS board endpoints
+# Stores ETag / Last-Modified, a body hash and the job ids it held per URL in
+# http_cache.db. An entry is only trusted while all of those jobs are in jobs.db
+# and the title filter that decided which ids count is still the same
+# ==============================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+DEFAULT_CACHE_PATH = "http_cache.db"
+
+class ResponseCache:
+    def __init__(self, db_path=DEFAULT_CACHE_PATH):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(http_cache)")]
+            if "job_ids" not in columns:
+                # Older caches: entries without ids are never trusted, so each board is parsed once more
+                self.conn.execute("ALTER TABLE http_cache ADD COLUMN job_ids TEXT")
+            if "filter_key" not in columns:
+                self.conn.execute("ALTER TABLE http_cache ADD COLUMN filter_key TEXT")
+            self.conn.commit()
+
+    @property
+    def enabled(self):
+        """FULL_SCAN=True ignores the cache and re-parses every board. Read per call, the scan service changes it per scan"""
+        return os.environ.get("FULL_SCAN") != "True"
+
+    def _get(self, url):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, content_hash, job_ids, filter_key FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+    def covered_by(self, url, known_ids, filter_key=""):
+        """
+        True if every job of the cached response is in known_ids and the entry was stored under the
+        same filter_key. Otherwise jobs from a failed save, lost with jobs.db or let through by an
+        edited filters.txt would never be emitted again.
+        """
+        row = self._get(url) if self.enabled else None
+        return bool(row and row[3] is not None and row[4] == filter_key and set(json.loads(row[3])) <= known_ids)
+
+    @staticmethod
+    def content_hash(response):
+        return hashlib.sha256(response.content).hexdigest()
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a URL we have seen before"""
+        row = self._get(url) if self.enabled else None
+        if not row:
+            return {}
+        headers = {}
+        if row[0]: headers["If-None-Match"] = row[0]
+        if row[1]: headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def is_unchanged(self, url, response):
+        """True if the server answered 304 or sent the exact same body as last time"""
+        if not self.enabled:
+            return False
+        if response.status_code == 304:
+            return True
+        if response.status_code != 200:
+            return False
+        row = self._get(url)
+        return bool(row and row[2] == self.content_hash(response))
+
+    def store(self, url, response, job_ids, filter_key=""):
+        """
+        Remembers a successfully processed 200 response and the ids of the jobs parsed from it
+        that are expected in jobs.db (the ones the filter identified by filter_key keeps)
+        """
+        if response.status_code != 200:
+            return
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO http_cache (url, etag, last_modified, content_hash, job_ids, filter_key, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag, last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash, job_ids = excluded.job_ids,
+                    filter_key = excluded.filter_key, updated_at = excluded.updated_at
+            """, (url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                  self.content_hash(response), json.dumps([str(i) for i in job_ids]), filter_key))
+            self.conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Returns the process-wide ResponseCache (created on first use)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
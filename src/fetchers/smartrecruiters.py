@@ -1,8 +1,9 @@
-import requests
-import time
-from .base import BaseFetcher
+from .base import BaseFetcher, FetchError
 
 class SmartRecruitersFetcher(BaseFetcher):
+    HOST = "api.smartrecruiters.com"
+    ATS_TYPE = "smartrecruiters"
+
     def fetch(self, target_config):
         print(f"[*] Fetching jobs for {target_config['name']} (SmartRecruiters)...")
         
@@ -14,14 +15,14 @@ class SmartRecruitersFetcher(BaseFetcher):
         while True:
             params = {"limit": limit, "offset": offset}
             try:
-                response = requests.get(api_url, params=params)
-                
-                if response.status_code == 429:
-                    print(f"    [!] Rate Limit Hit. Sleeping 10s...")
-                    time.sleep(10)
-                    continue
+                response = self.http_get(api_url, params=params)
                 
-                if response.status_code != 200: break
+                # 429s are retried (with Retry-After) inside the HTTP client
+                if response.status_code != 200:
+                    print(f"    [!] Error: {response.status_code}")
+                    # A later page failing keeps what was read; the first one means the board is down
+                    if offset == 0: raise FetchError(response.status_code)
+                    break
                 
                 data = response.json()
                 batch = data.get('content', [])
@@ -34,9 +35,11 @@ class SmartRecruitersFetcher(BaseFetcher):
                     if "israel" in loc or "'il'" in loc:
                         relevant_batch.append(job)
 
-                print(f"    -> Offset {offset}: Scanned {len(batch)} | Kept {len(relevant_batch)} (Israel)")
+                # Jobs already in the DB would be dropped later anyway, don't pay for their details
+                new_batch = [job for job in relevant_batch if not self.is_known(job.get("id"))]
+                print(f"    -> Offset {offset}: Scanned {len(batch)} | Kept {len(relevant_batch)} (Israel) | New {len(new_batch)}")
 
-                for job in relevant_batch:
+                for job in new_batch:
                     job_obj = {
                         "company": target_config["name"],
                         "title": job.get("name"),
@@ -51,17 +54,19 @@ class SmartRecruitersFetcher(BaseFetcher):
 
                 if offset > 80: break
                 offset += limit
-                time.sleep(2) 
                 
+            except FetchError:
+                raise
             except Exception as e:
                 print(f"[!] Crash: {e}")
+                if offset == 0: raise FetchError(e) from e
                 break
             
         return all_jobs
 
     def _fetch_description(self, url):
         try:
-            res = requests.get(url)
+            res = self.http_get(url)
             data = res.json()
             full_text = ""
             if 'jobAd' in data and 'sections' in data['jobAd']:
@@ -1,10 +1,79 @@
-import requests
+import re
 import time
+import threading
 from .base import BaseFetcher
+from .json_store import JsonStore
+from .browser import get_browser_service
 
 GLOBAL_SESSIONS = {} 
+# session_key -> time of the last failed handshake. Other page workers skip the tenant
+# until HANDSHAKE_RETRY has passed, so a transient failure does not stick in a long-lived process
+_failed_handshakes = {}
+_session_locks = {}
+_locks_guard = threading.Lock()
+
+# Workday's own page size. Bigger pages are probed per tenant by the scheduler
+BASE_LIMIT = 20
+
+# Capture all possible Israel variations (Yokneam is a huge hub for Nvidia)
+ISRAEL_LOCS = ["israel", "isr", "herzliya", "raanana", "haifa", "tel aviv", "beer sheba", "yokneam", "tivon"]
+
+# Israel location facet IDs per tenant, discovered once and reused between runs
+FACETS_PATH = "workday_facets.json"
+FACETS_TTL = 7 * 24 * 3600
+
+# Handshake cookies per tenant, reused between runs until they expire or a request fails
+SESSIONS_PATH = "workday_sessions.json"
+SESSION_TTL = 12 * 3600
+HANDSHAKE_RETRY = 5 * 60
+# Statuses that mean the session (or the facet IDs sent with it) is no longer accepted.
+# 429 and 5xx are the server's problem: the handshake is kept for the retry
+SESSION_ERRORS = (400, 401, 403)
+
+facet_store = JsonStore(FACETS_PATH)
+session_store = JsonStore(SESSIONS_PATH)
+
+def find_israel_facets(facets):
+    """
+    {facetParameter: [ids]} for the facet values naming an Israel location, from the CXS "facets" section.
+    A country facet wins, otherwise the single facet with the most matches (two facets would be AND-ed).
+    """
+    found = {}
+    def walk(items, parent_param):
+        for item in items or []:
+            param = item.get("facetParameter") or parent_param
+            if item.get("values"):
+                walk(item["values"], param)
+            elif item.get("id") and param and any(k in (item.get("descriptor") or "").lower() for k in ISRAEL_LOCS):
+                found.setdefault(param, []).append(item["id"])
+    walk(facets, None)
+    if not found:
+        return {}
+    country = [p for p in found if "country" in p.lower()]
+    best = country[0] if country else max(found, key=lambda p: len(found[p]))
+    return {best: found[best]}
+
+def tenant_parts(url):
+    """(base_url, tenant_id, portal_id, session_key) of a CXS URL (jobs list or job detail)"""
+    hostname = url.split('//')[1].split('/')[0]
+    tenant_id = hostname.split('.')[0]
+    portal_id = url.split('/cxs/')[1].split('/')[0]
+    return f"https://{hostname}", tenant_id, portal_id, f"{tenant_id}_{portal_id}"
+
+def html_to_text(html):
+    """Job description HTML -> compact plain text (one line per block, no blank runs)"""
+    from bs4 import BeautifulSoup
+    text = BeautifulSoup(html or "", "html.parser").get_text("\n", strip=True)
+    return re.sub(r"\n{2,}", "\n", text)
+
+def cookies_expiry(cookies):
+    """Earliest expiry among the cookies that have one, else SESSION_TTL from now"""
+    expiries = [c["expires"] for c in cookies if c.get("expires", -1) > 0]
+    return min(expiries + [time.time() + SESSION_TTL])
 
 class WorkdayFetcher(BaseFetcher):
+    ATS_TYPE = "workday"
+
     def __init__(self):
         self.common_headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
@@ -16,70 +85,138 @@ class WorkdayFetcher(BaseFetcher):
         jobs, _, total = self.fetch_single_batch(target_config, 0)
         return jobs
 
+    def _session_from_cookies(self, cookies):
+        session = self.http.new_session()
+        for c in cookies:
+            session.cookies.set(c['name'], c['value'])
+        return session
+
     def _get_selenium_handshake(self, url):
-        from playwright.sync_api import sync_playwright
+        """Cookies of the careers page, loaded in the shared browser (None on failure)"""
+        try:
+            # The page's own CXS jobs call marks the session as ready
+            return get_browser_service().handshake(url, ready_url="/wday/cxs/")
+        except Exception as e:
+            print(f"    [!] Handshake failed: {e}")
+            return None
+
+    def _get_session(self, target_config, session_key, base_url, tenant_id, portal_id):
+        """
+        Session per tenant: in memory, else the cookies saved by an earlier run, else a new handshake.
+        One handshake per tenant even with parallel page workers; other tenants handshake in parallel.
+        """
+        with _locks_guard:
+            lock = _session_locks.setdefault(session_key, threading.Lock())
+        with lock:
+            if session_key in GLOBAL_SESSIONS:
+                return GLOBAL_SESSIONS[session_key]
+            if time.time() - _failed_handshakes.get(session_key, 0) < HANDSHAKE_RETRY:
+                return None
+
+            entry = session_store.get(session_key, SESSION_TTL)
+            if entry and entry["expires"] > time.time():
+                GLOBAL_SESSIONS[session_key] = self._session_from_cookies(entry["cookies"])
+                return GLOBAL_SESSIONS[session_key]
+
+            print(f"    [*] Handshaking {target_config['name']} ({tenant_id}/{portal_id})...")
+            cookies = self._get_selenium_handshake(f"{base_url}/en-US/{portal_id}/jobs")
+            if cookies is None:
+                _failed_handshakes[session_key] = time.time()
+                return None
+            _failed_handshakes.pop(session_key, None)
+            session_store.put(session_key, cookies=cookies, expires=cookies_expiry(cookies))
+            GLOBAL_SESSIONS[session_key] = self._session_from_cookies(cookies)
+            return GLOBAL_SESSIONS[session_key]
+
+    def _drop_session(self, session_key):
+        """The tenant rejected its cookies: next request handshakes again"""
+        GLOBAL_SESSIONS.pop(session_key, None)
+        session_store.pop(session_key)
+
+    def _location_facets(self, target_config, session, headers, session_key, tenant_id):
+        """appliedFacets for the tenant's Israel locations ({} = fall back to searchText)"""
+        entry = facet_store.get(session_key, FACETS_TTL)
+        if entry:
+            return entry["facets"]
+
+        # Facets for the whole tenant come with any search, one row is enough
+        payload = {"appliedFacets": {}, "limit": 1, "offset": 0, "searchText": "", "subdomain": tenant_id}
+        response = self.http.post(target_config['url'], ats_type=self.ATS_TYPE, session=session, json=payload, headers=headers)
+        if response.status_code != 200:
+            return {}
+
+        facets = find_israel_facets(response.json().get("facets", []))
+        if facets:
+            param, ids = next(iter(facets.items()))
+            print(f"    [*] {target_config['name']}: using location facet '{param}' ({len(ids)} Israel values)")
+        facet_store.put(session_key, facets=facets)
+        return facets
+
+    def _headers(self, base_url, tenant_id, portal_id):
+        headers = self.common_headers.copy()
+        headers.update({
+            "X-Workday-Subdomain": tenant_id,
+            "Origin": base_url,
+            "Referer": f"{base_url}/en-US/{portal_id}/jobs"
+        })
+        return headers
+
+    def fetch_description(self, description_url, name="Workday"):
+        """Plain-text description of one posting through the tenant's session (None on failure)"""
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=["--no-sandbox", "--disable-dev-shm-usage"]
-                )
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-                )
-                page = context.new_page()
-                try:
-                    page.goto(url, wait_until="domcontentloaded", timeout=25000)
-                    page.wait_for_selector("body", timeout=25000)
-                    time.sleep(7)
-                    session = requests.Session()
-                    for c in context.cookies():
-                        session.cookies.set(c['name'], c['value'])
-                    return session
-                except Exception as e:
-                    print(f"    [!] Handshake failed: {e}")
-                    return None
-                finally:
-                    browser.close()
+            base_url, tenant_id, portal_id, session_key = tenant_parts(description_url)
+            session = self._get_session({"name": name}, session_key, base_url, tenant_id, portal_id)
+            if not session: return None
+
+            response = self.http.get(description_url, ats_type=self.ATS_TYPE, session=session,
+                                     headers=self._headers(base_url, tenant_id, portal_id))
+            if response.status_code != 200:
+                # 404 = posting removed, the session itself is fine
+                if response.status_code in (401, 403):
+                    self._drop_session(session_key)
+                return None
+            info = response.json().get("jobPostingInfo", {})
+            return html_to_text(info.get("jobDescription")) or None
         except Exception as e:
-            print(f"    [!] Playwright launch failed: {e}")
+            print(f"    [!] Description Error: {e}")
             return None
 
     def fetch_single_batch(self, target_config, offset):
-        limit = 20
+        jobs, batch_count, total_matches, _ = self.fetch_page(target_config, offset, BASE_LIMIT)
+        return jobs, (batch_count == BASE_LIMIT), total_matches
+
+    def fetch_page(self, target_config, offset, limit=BASE_LIMIT, probe=False):
+        """
+        One CXS page. Returns (jobs, batch_count, total_matches, status_code).
+        probe=True is used to test a bigger limit: a 400 then means "limit not accepted", not a dead session.
+        """
         all_batch_jobs = []
         try:
-            hostname = target_config['url'].split('//')[1].split('/')[0]
-            tenant_id = hostname.split('.')[0]
-            portal_id = target_config['url'].split('/cxs/')[1].split('/')[0]
-            base_url = f"https://{hostname}"
-            session_key = f"{tenant_id}_{portal_id}"
-
-            if session_key not in GLOBAL_SESSIONS:
-                print(f"    [*] Handshaking {target_config['name']} ({tenant_id}/{portal_id})...")
-                GLOBAL_SESSIONS[session_key] = self._get_selenium_handshake(f"{base_url}/en-US/{portal_id}/jobs")
-
-            session = GLOBAL_SESSIONS[session_key]
-            if not session: return [], False, 0
-
-            headers = self.common_headers.copy()
-            headers.update({
-                "X-Workday-Subdomain": tenant_id,
-                "Origin": base_url,
-                "Referer": f"{base_url}/en-US/{portal_id}/jobs"
-            })
-
-            # Nvidia usually responds best to "Israel"
+            base_url, tenant_id, portal_id, session_key = tenant_parts(target_config['url'])
+            # Detail endpoint lives next to the list endpoint: .../cxs/<tenant>/<site>/job/...
+            site_url = target_config['url'].rsplit('/jobs', 1)[0]
+
+            session = self._get_session(target_config, session_key, base_url, tenant_id, portal_id)
+            if not session: return [], 0, 0, None
+
+            headers = self._headers(base_url, tenant_id, portal_id)
+
+            # Server-side Israel filter when the tenant exposes location facets,
+            # otherwise the keyword search (Nvidia usually responds best to "Israel")
+            facets = self._location_facets(target_config, session, headers, session_key, tenant_id)
             payload = {
-                "appliedFacets": {}, 
+                "appliedFacets": facets, 
                 "limit": limit, "offset": offset, 
-                "searchText": "Israel", "subdomain": tenant_id
+                "searchText": "" if facets else "Israel", "subdomain": tenant_id
             }
             
-            response = session.post(target_config['url'], json=payload, headers=headers, timeout=15)
+            response = self.http.post(target_config['url'], ats_type=self.ATS_TYPE, session=session, json=payload, headers=headers)
             if response.status_code != 200:
-                if session_key in GLOBAL_SESSIONS: del GLOBAL_SESSIONS[session_key]
-                return [], False, 0
+                if response.status_code in SESSION_ERRORS and not (probe and response.status_code == 400):
+                    self._drop_session(session_key)
+                    # Facet IDs may have changed, rediscover next time
+                    if facets: facet_store.pop(session_key)
+                return [], 0, 0, response.status_code
 
             data = response.json()
             batch = data.get("jobPostings", [])
@@ -88,12 +225,10 @@ class WorkdayFetcher(BaseFetcher):
             if offset == 0:
                 print(f"    [*] {target_config['name']} connected. API Total Matches: {total_matches}")
 
-            # Capture all possible Israel variations (Yokneam is a huge hub for Nvidia)
-            valid_locs = ["israel", "isr", "herzliya", "raanana", "haifa", "tel aviv", "beer sheba", "yokneam", "tivon"]
-            
+            # Still checked locally: facets narrow the search, multi-location rows may mention other countries
             for job in batch:
                 loc_text = job.get('locationsText', '')
-                if any(k in loc_text.lower() for k in valid_locs):
+                if any(k in loc_text.lower() for k in ISRAEL_LOCS):
                     slug = job.get('externalPath')
                     all_batch_jobs.append({
                         "company": target_config["name"],
@@ -103,14 +238,14 @@ class WorkdayFetcher(BaseFetcher):
                         "id": job.get("bulletFields", [None])[0] or slug,
                         "tenant_id": tenant_id,
                         "url": f"{base_url}{slug}",
-                        "description_url": f"{base_url}/wday/cxs/{portal_id}/job{slug}"
+                        "description_url": f"{site_url}{slug}"
                     })
             
             # DEBUG LOG: If we found 0 in a batch of 20, let's see what the first one was
             if total_matches > 0 and len(all_batch_jobs) == 0 and len(batch) > 0:
                 print(f"    [DEBUG] {target_config['name']} skipping batch. Example location: '{batch[0].get('locationsText')}'")
 
-            return all_batch_jobs, (len(batch) == limit), total_matches
+            return all_batch_jobs, len(batch), total_matches, response.status_code
         except Exception as e:
             print(f"    [!] Batch Error: {e}")
-            return [], False, 0
\ No newline at end of file
+            return [], 0, 0, None
@@ -0,0 +1,115 @@
+# ==============================================================================
+# Handles scanning all Workday tenants in parallel
+# Every tenant paginates on its own worker, pages are prefetched once the total
+# is known, and all of them share the "workday" rate budget of the HTTP client
+# ==============================================================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .workday import BASE_LIMIT
+
+# Bigger page sizes we try per tenant (first accepted wins, otherwise BASE_LIMIT)
+LIMIT_CANDIDATES = [100, 50]
+# Safety cap for tenants that report huge totals
+MAX_OFFSET = 5000
+
+class WorkdayScheduler:
+    def __init__(self, workday_fetcher, on_jobs, max_tenants=8, prefetch_window=3, log=print, on_stats=None, stop=None):
+        """
+        on_jobs(target_config, jobs) is called for every page with new jobs,
+        on_stats(target_config, seconds, error) once per tenant when given.
+        max_tenants: tenants scanned at once. prefetch_window: pages in flight per tenant.
+        stop: optional threading.Event, tenants and pages not requested yet are skipped once it is set.
+        """
+        self.fetcher = workday_fetcher
+        self.on_jobs = on_jobs
+        self.on_stats = on_stats
+        self.stop = stop
+        self.max_tenants = max_tenants
+        self.prefetch_window = prefetch_window
+        self.log = log
+        # Accepted page size per tenant URL, remembered for the life of the process
+        self.page_limits = {}
+        self.lock = threading.Lock()
+
+    def run(self, targets):
+        with ThreadPoolExecutor(max_workers=self.max_tenants) as pool:
+            counts = list(pool.map(self._scan_tenant, targets))
+        return sum(counts)
+
+    def _emit(self, target, jobs, seen_ids):
+        # Workday sometimes repeats rows across pages
+        new_jobs = [j for j in jobs if j['id'] not in seen_ids]
+        seen_ids.update(j['id'] for j in new_jobs)
+        if new_jobs:
+            self.on_jobs(target, new_jobs)
+        return len(new_jobs)
+
+    def _find_limit(self, target, offset, seen_ids):
+        """Tries bigger page sizes once per tenant. Returns (limit, next_offset, found)"""
+        with self.lock:
+            known = self.page_limits.get(target['url'])
+        if known:
+            return known, offset, 0
+
+        for candidate in LIMIT_CANDIDATES:
+            jobs, batch_count, _, status = self.fetcher.fetch_page(target, offset, candidate, probe=True)
+            if status == 200 and batch_count > BASE_LIMIT:
+                with self.lock:
+                    self.page_limits[target['url']] = candidate
+                return candidate, offset + candidate, self._emit(target, jobs, seen_ids)
+            if status == 200:
+                # Accepted but capped (or last page): nothing to gain from bigger pages
+                break
+
+        with self.lock:
+            self.page_limits[target['url']] = BASE_LIMIT
+        return BASE_LIMIT, offset, 0
+
+    def _stopped(self):
+        return self.stop is not None and self.stop.is_set()
+
+    def _fetch_page(self, target, offset, limit):
+        """fetch_page(), or an empty failed page once the scan is cancelled"""
+        if self._stopped():
+            return [], 0, 0, None
+        return self.fetcher.fetch_page(target, offset, limit)
+
+    def _scan_tenant(self, target):
+        if self._stopped():
+            return 0
+        start = time.perf_counter()
+        found, error = self._scan_pages(target)
+        if self.on_stats:
+            self.on_stats(target, time.perf_counter() - start, error)
+        return found
+
+    def _scan_pages(self, target):
+        """(jobs found, whether the tenant failed)"""
+        seen_ids = set()
+        found = 0
+        try:
+            jobs, batch_count, total, status = self.fetcher.fetch_page(target, 0, BASE_LIMIT)
+            if status != 200:
+                return 0, True
+            found += self._emit(target, jobs, seen_ids)
+            total = min(total, MAX_OFFSET)
+            if batch_count < BASE_LIMIT or total <= BASE_LIMIT:
+                self.log(f"    [+] {target['name']}: {found} jobs (1 page).")
+                return found, False
+
+            limit, offset, probe_found = self._find_limit(target, BASE_LIMIT, seen_ids)
+            found += probe_found
+
+            # Total is known, so all remaining offsets can be requested up front
+            offsets = list(range(offset, total, limit))
+            with ThreadPoolExecutor(max_workers=self.prefetch_window) as pages:
+                for page_jobs, _, _, _ in pages.map(lambda o: self._fetch_page(target, o, limit), offsets):
+                    found += self._emit(target, page_jobs, seen_ids)
+
+            self.log(f"    [+] {target['name']}: {found} jobs ({total} matches, page size {limit}).")
+            return found, False
+        except Exception as e:
+            self.log(f"    [!] Workday scheduler error for {target['name']}: {e}")
+            return found, True
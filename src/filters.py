@@ -0,0 +1,129 @@
+# ==============================================================================
+# Handles the title keyword filter (filters.txt)
+# The file is parsed once (and again only when it changes) into compiled regexes
+# ==============================================================================
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+# How often (seconds) we stat() the file to look for edits
+RELOAD_CHECK_INTERVAL = 1.0
+
+class KeywordFilter:
+    """
+    filters.txt syntax:
+        keyword          exclude titles containing this word
+        +keyword         include list: when present, titles must contain one of these
+        [Company Name]   following lines only apply to that company:
+            keyword      extra exclusion for this company
+            +keyword     extra include for this company
+            !keyword     allow a globally excluded keyword for this company
+        # comment        everything after '#' is ignored
+    """
+
+    def __init__(self, path="filters.txt"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.last_check = 0
+        self._reset()
+
+    def _reset(self):
+        self.excludes = []
+        self.includes = []
+        self.overrides = {}   # company -> {"exclude": [], "include": [], "allow": []}
+        self._compiled = {}   # company (or None) -> (exclude_regex, include_regex)
+
+    def _parse(self):
+        self._reset()
+        company = None
+        with open(self.path, "r", encoding='utf-8') as f:
+            for line in f:
+                clean_line = line.strip()
+                if not clean_line or clean_line.startswith("#"):
+                    continue
+                if clean_line.startswith("[") and clean_line.endswith("]"):
+                    company = clean_line[1:-1].strip().lower() or None
+                    continue
+
+                keyword = clean_line.split("#")[0].strip().lower()
+                kind = "exclude"
+                if keyword[:1] in ("+", "!"):
+                    kind = "include" if keyword[0] == "+" else "allow"
+                    keyword = keyword[1:].strip()
+                if not keyword:
+                    continue
+
+                if company is None:
+                    if kind == "include": self.includes.append(keyword)
+                    elif kind == "exclude": self.excludes.append(keyword)
+                else:
+                    rules = self.overrides.setdefault(company, {"exclude": [], "include": [], "allow": []})
+                    rules[kind].append(keyword)
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self.last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self.last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        if mtime is None:
+            self._reset()
+        else:
+            self._parse()
+
+    @staticmethod
+    def _compile(keywords):
+        """All keywords in one alternation, longest first so the reported match is the most specific"""
+        if not keywords:
+            return None
+        unique = sorted(set(keywords), key=len, reverse=True)
+        return re.compile(r'\b(?:' + "|".join(re.escape(k) for k in unique) + r')\b')
+
+    def _patterns_for(self, company):
+        key = company.lower() if company else None
+        if key not in self.overrides:
+            key = None
+        if key not in self._compiled:
+            excludes, includes = self.excludes, self.includes
+            if key is not None:
+                rules = self.overrides[key]
+                allowed = set(rules["allow"])
+                excludes = [k for k in excludes if k not in allowed] + rules["exclude"]
+                includes = includes + rules["include"]
+            self._compiled[key] = (self._compile(excludes), self._compile(includes))
+        return self._compiled[key]
+
+    def match(self, title, company=None):
+        """Returns the reason a title is rejected (the matched keyword), or None if it is kept"""
+        with self.lock:
+            self._reload_if_changed()
+            exclude_re, include_re = self._patterns_for(company)
+
+        title_lower = (title or "").lower()
+        if exclude_re:
+            hit = exclude_re.search(title_lower)
+            if hit:
+                return hit.group(0)
+        if include_re and not include_re.search(title_lower):
+            return "(not in include list)"
+        return None
+
+    def fingerprint(self):
+        """Short hash of the current rules, changes whenever filters.txt says something different"""
+        with self.lock:
+            self._reload_if_changed()
+            rules = repr((self.excludes, self.includes, sorted(self.overrides.items())))
+        return hashlib.sha256(rules.encode("utf-8")).hexdigest()[:16]
+
+    def should_keep(self, title, company=None):
+        return self.match(title, company) is None
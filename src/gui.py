@@ -4,7 +4,7 @@
 # ==============================================================================
 
 import flet as ft
-import datetime, sqlite3, math, threading, time, subprocess, os
+import datetime, math, threading, time, subprocess, os
 from src.storage import JobStorage
 from src.engine import AppEngine
 import src.config as cfg
@@ -33,7 +33,6 @@ def main(page: ft.Page):
     page.padding = 0
 
     storage = JobStorage(db_path="jobs.db")
-    storage.conn = sqlite3.connect("jobs.db", check_same_thread=False)
     engine = AppEngine(storage)
     
     state = {"current_page": 0, "search": ""}
@@ -199,7 +198,7 @@ def main(page: ft.Page):
         progress_ring.visible = False
         run_button.text = "RUN JOB SEARCH"; run_button.bgcolor = cfg.ACCENT_COLOR
         status_dot.bgcolor = cfg.ACCENT_COLOR if engine.is_auto_mode else cfg.TEXT_GREY
-        status_text.value = "AUTO-MODE (30m)" if engine.is_auto_mode else "System Idle"
+        status_text.value = "AUTO-MODE" if engine.is_auto_mode else "System Idle"
         status_text.color = cfg.ACCENT_COLOR if engine.is_auto_mode else cfg.TEXT_GREY
         
         # UPDATE FIX: Correctly update heartbeat label
@@ -208,13 +207,13 @@ def main(page: ft.Page):
         load_jobs_from_db()
         page.update()
 
-    def on_run_click(e):
+    def on_run_click(e, full_scan=True):
         if engine.is_running:
             engine.stop_pipeline(); status_text.value = "TERMINATING..."; status_text.color = cfg.ERROR_COLOR; page.update(); return
         engine.is_running = True; progress_ring.visible = True; run_button.text = "STOP SEARCH"; run_button.bgcolor = cfg.ERROR_COLOR
         status_dot.bgcolor = cfg.ACCENT_COLOR; status_text.value = "SEARCHING..."; status_text.color = cfg.ACCENT_COLOR
         log_view.controls.clear(); page.update()
-        threading.Thread(target=engine.run_pipeline, args=(lambda m: (log_view.controls.append(ft.Text(m, size=10, color="#B3B3B3")), page.update()), on_pipeline_finish), daemon=True).start()
+        threading.Thread(target=engine.run_pipeline, args=(lambda m: (log_view.controls.append(ft.Text(m, size=10, color="#B3B3B3")), page.update()), on_pipeline_finish, full_scan), daemon=True).start()
 
     # --- 5. NAVIGATION ---
     def on_nav_change(e):
@@ -342,11 +341,12 @@ def main(page: ft.Page):
     page.add(ft.Row([sidebar, ft.Stack([feed_view, settings_view], expand=True)], expand=True))
     load_jobs_from_db()
 
+    # Short ticks: each one only scans the targets that are due (see src/target_scheduler.py)
     def auto_scan_loop():
         while True:
             if engine.is_auto_mode and not engine.is_running:
-                on_run_click(None) 
-                time.sleep(1800)
+                on_run_click(None, full_scan=False)
+                time.sleep(cfg.AUTO_SCAN_TICK)
             time.sleep(10)
     threading.Thread(target=auto_scan_loop, daemon=True).start()
 
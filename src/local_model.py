@@ -0,0 +1,120 @@
+# ==============================================================================
+# Handles the local CPU relevance model (offline alternative to the OpenAI brain)
+# Hashed bag-of-words + logistic regression, trained on our own labeled jobs.db rows
+# Train it with: python -m src.local_model train
+# ==============================================================================
+
+import json
+import math
+import os
+import random
+import re
+import sys
+import zlib
+
+MODEL_PATH = "local_model.json"
+N_FEATURES = 2 ** 18
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+TAG_RE = re.compile(r'<[^>]+>')
+
+def tokenize(title, description):
+    """Title words, title bigrams and description words (first 1000 chars, like the AI sees)"""
+    title_words = TOKEN_RE.findall((title or "").lower())
+    desc_text = TAG_RE.sub(" ", (description or "")[:1000]).lower()
+    tokens = ["t:" + w for w in title_words]
+    tokens += ["tb:" + a + "_" + b for a, b in zip(title_words, title_words[1:])]
+    tokens += ["d:" + w for w in TOKEN_RE.findall(desc_text)]
+    return tokens
+
+def hash_features(tokens, n_features=N_FEATURES):
+    """Sparse {index: weight} vector. crc32 is stable between runs (unlike hash())"""
+    features = {}
+    for token in tokens:
+        idx = zlib.crc32(token.encode("utf-8")) % n_features
+        features[idx] = features.get(idx, 0.0) + 1.0
+    # Length normalization so long descriptions don't dominate
+    norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+    return {k: v / norm for k, v in features.items()}
+
+
+class LocalRelevanceModel:
+    def __init__(self, weights=None, bias=0.0, n_features=N_FEATURES):
+        self.weights = weights or {}
+        self.bias = bias
+        self.n_features = n_features
+
+    def _score(self, features):
+        z = self.bias + sum(self.weights.get(i, 0.0) * v for i, v in features.items())
+        z = max(-30.0, min(30.0, z))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def predict_proba(self, title, description):
+        """Probability that the job is relevant (0..1)"""
+        return self._score(hash_features(tokenize(title, description), self.n_features))
+
+    def train(self, rows, epochs=8, lr=0.5, l2=1e-6, seed=42):
+        """rows: (title, description, label) with label 1 = relevant, 0 = irrelevant. Plain SGD"""
+        data = [(hash_features(tokenize(t, d), self.n_features), y) for t, d, y in rows]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for features, y in data:
+                error = self._score(features) - y
+                for i, v in features.items():
+                    w = self.weights.get(i, 0.0)
+                    self.weights[i] = w - lr * (error * v + l2 * w)
+                self.bias -= lr * error
+        return self
+
+    def save(self, path=MODEL_PATH):
+        with open(path, "w") as f:
+            json.dump({"n_features": self.n_features, "bias": self.bias,
+                       "weights": {str(k): v for k, v in self.weights.items() if abs(v) > 1e-6}}, f)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """Returns the saved model, or None if it was never trained"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        weights = {int(k): v for k, v in data["weights"].items()}
+        return cls(weights=weights, bias=data["bias"], n_features=data["n_features"])
+
+
+def load_labeled_rows(db_path="jobs.db"):
+    """(title, description, label) for every job the AI (or the rules) already decided"""
+    from src.storage import JobStorage
+    storage = JobStorage(db_path)
+    try:
+        rows = storage.get_labeled_jobs()
+    finally:
+        storage.conn.close()
+    return [(t, d, 1 if label == 1 else 0) for t, d, label in rows]
+
+def train_from_db(db_path="jobs.db", model_path=MODEL_PATH, holdout=0.2):
+    rows = load_labeled_rows(db_path)
+    if len(rows) < 20:
+        print(f"[!] Only {len(rows)} labeled jobs in {db_path}, need at least 20 to train.")
+        return None
+
+    random.Random(7).shuffle(rows)
+    split = int(len(rows) * (1 - holdout))
+    train_rows, test_rows = rows[:split], rows[split:]
+
+    model = LocalRelevanceModel().train(train_rows)
+    correct = sum((model.predict_proba(t, d) >= 0.5) == bool(y) for t, d, y in test_rows)
+    print(f"[*] Trained on {len(train_rows)} jobs. Holdout accuracy: {correct}/{len(test_rows)}")
+
+    # Final model uses everything
+    model = LocalRelevanceModel().train(rows)
+    model.save(model_path)
+    print(f"[*] Saved local model to {model_path}")
+    return model
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        train_from_db(sys.argv[2] if len(sys.argv) > 2 else "jobs.db")
+    else:
+        print("Usage: python -m src.local_model train [jobs.db]")
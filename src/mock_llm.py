@@ -0,0 +1,147 @@
+# ==============================================================================
+# Handles a local stand-in for the OpenAI chat API (offline / load testing)
+# Answers /v1/chat/completions with deterministic JobAnalysis-shaped JSON
+# Run it with: python -m src.mock_llm --port 8765 --latency 0.5 --error-rate 0.05
+# ==============================================================================
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SENIOR_WORDS = ("senior", "sr", "staff", "principal", "lead", "manager", "director", "head")
+TECH_WORDS = ("python", "java", "c++", "go", "react", "node", "aws", "kubernetes", "linux", "sql")
+
+def mock_verdict(title, description):
+    """Deterministic answer for one job: same title + description -> same verdict"""
+    seed = int(hashlib.sha256(f"{title}\n{description}".encode("utf-8")).hexdigest(), 16)
+    title_words = re.findall(r"[a-z]+", (title or "").lower())
+    years = seed % 6
+    if any(w in SENIOR_WORDS for w in title_words):
+        years = max(years, 5)
+    text = f"{title} {description}".lower()
+    tech = [t for t in TECH_WORDS if t in text][:5] or ["python"]
+    relevant = years <= 3
+    return {
+        "is_relevant": relevant,
+        "years_required": years,
+        "tech_stack": tech,
+        "reason": f"Mock verdict: {years} years required.",
+    }
+
+def parse_jobs(prompt):
+    """[(job_id, title, description)] from a single or batched JobBrain prompt"""
+    blocks = re.split(r"--- Job ID: (.+?) ---", prompt)
+    if len(blocks) == 1:
+        blocks = [None, None, prompt]
+    jobs = []
+    for i in range(1, len(blocks), 2):
+        block = blocks[i + 1]
+        title = re.search(r"Title: (.*)", block)
+        desc = re.search(r"Description: (.*)", block)
+        jobs.append((blocks[i], title.group(1).strip() if title else "", desc.group(1).strip() if desc else ""))
+    return jobs
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        with server.lock:
+            delay = server.latency + server.rng.uniform(0, server.jitter)
+            roll = server.rng.random()
+            server.requests_served += 1
+        time.sleep(delay)
+
+        if roll < server.error_rate:
+            self._send_json(500, {"error": {"message": "Mock server error", "type": "server_error"}})
+            return
+        if roll < server.error_rate + server.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "Mock rate limit", "type": "rate_limit_error"}},
+                            headers={"Retry-After": "1"})
+            return
+
+        prompt = next((m.get("content", "") for m in reversed(request.get("messages", [])) if m.get("role") == "user"), "")
+        schema = request.get("response_format", {}).get("json_schema", {}).get("schema", {})
+        jobs = parse_jobs(prompt)
+        if "results" in schema.get("properties", {}):
+            content = {"results": [dict(mock_verdict(title, desc), job_id=j_id) for j_id, title, desc in jobs]}
+        else:
+            content = mock_verdict(jobs[0][1], jobs[0][2])
+
+        content_text = json.dumps(content)
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{server.requests_served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content_text, "refusal": None},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content_text) // 4,
+                "total_tokens": (len(prompt) + len(content_text)) // 4,
+            },
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, latency=0.2, jitter=0.1, error_rate=0.0, rate_limit_rate=0.0, seed=1234):
+    """Starts the mock server on a background thread. Returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.rate_limit_rate = rate_limit_rate
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests_served = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible server for JobBrain")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Base seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.host, args.port, args.latency, args.jitter,
+                                         args.error_rate, args.rate_limit_rate, args.seed)
+    print(f"[*] Mock LLM listening on {base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,105 @@
+# ==============================================================================
+# Handles the local rule-based pre-classifier that runs before the AI Brain
+# Obvious jobs (Senior titles, Intern titles, "5+ years") never reach the model
+# ==============================================================================
+
+import html
+import re
+
+# Same rules the JobBrain prompt gives the model
+REJECT_TITLE_WORDS = ["senior", "sr", "staff", "principal", "lead", "head", "director", "manager", "architect", "vp"]
+ACCEPT_TITLE_WORDS = ["student", "intern", "internship", "junior", "jr", "graduate", "new grad", "entry level", "associate"]
+
+# Jobs asking for at least this many years are rejected, jobs asking for at most JUNIOR_MAX_YEARS accepted
+REJECT_MIN_YEARS = 4
+JUNIOR_MAX_YEARS = 2
+
+TECH_KEYWORDS = [
+    "python", "java", "c++", "c#", "golang", "javascript", "typescript", "react", "angular", "node.js",
+    "kotlin", "swift", "rust", "scala", "sql", "linux", "aws", "gcp", "azure", "kubernetes", "docker",
+]
+
+def _word_regex(words):
+    return re.compile(r'\b(?:' + "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)) + r')\b')
+
+# "5+ years of experience", "3-5 years' experience", "at least 4 yrs of hands-on experience"
+YEARS_RE = re.compile(
+    r'\b(\d{1,2})\s*(\+|plus)?\s*(?:(?:-|–|to)\s*(\d{1,2})\s*\+?\s*)?(?:years?|yrs?)\b[^.\n]{0,60}?\bexperience',
+    re.IGNORECASE
+)
+# "N+" and ranges read as requirements. A bare "N years ... experience" needs requirement wording
+# next to it, so "a company with over 20 years of experience" does not count
+REQUIRED_BEFORE_RE = re.compile(
+    r"\b(?:minimum|min|at least|requires?|required|you have|you'll have|you bring|must have|need)\b[^.\n]{0,25}$",
+    re.IGNORECASE
+)
+REQUIRED_AFTER_RE = re.compile(r'^[^.\n]{0,25}\b(?:required|a must|must)\b', re.IGNORECASE)
+# Bigger numbers describe the company, not the candidate
+MAX_REQUIRED_YEARS = 15
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+class PreClassifier:
+    def __init__(self):
+        self.reject_re = _word_regex(REJECT_TITLE_WORDS)
+        self.accept_re = _word_regex(ACCEPT_TITLE_WORDS)
+        # \b does not work around "+" / "#", match those on whitespace/punctuation instead
+        self.tech_re = re.compile(r'(?<![\w+#])(?:' + "|".join(re.escape(t) for t in TECH_KEYWORDS) + r')(?![\w+#])')
+
+    @staticmethod
+    def clean_text(description):
+        # Some ATS (Greenhouse) send escaped HTML
+        return TAG_RE.sub(" ", html.unescape(html.unescape(description or "")))
+
+    def extract_years(self, text):
+        """All (min, max) years of experience the job asks for ('5+' is (5, 5))"""
+        ranges = []
+        for m in YEARS_RE.finditer(text):
+            low = int(m.group(1))
+            high = int(m.group(3)) if m.group(3) else low
+            if max(low, high) > MAX_REQUIRED_YEARS:
+                continue
+            required = (m.group(2) or m.group(3)
+                        or REQUIRED_BEFORE_RE.search(text, max(0, m.start() - 60), m.start())
+                        or REQUIRED_AFTER_RE.search(text[m.end():m.end() + 40]))
+            if required:
+                ranges.append((low, max(low, high)))
+        return ranges
+
+    def extract_tech(self, text):
+        found = []
+        for m in self.tech_re.finditer(text.lower()):
+            if m.group(0) not in found:
+                found.append(m.group(0))
+            if len(found) == 5:
+                break
+        return found
+
+    def classify(self, title, description):
+        """
+        Returns a verdict (is_relevant, ai_reason, tech_stack, years_required) like the AI stage writes,
+        or None when the job is ambiguous and should go to the model.
+        """
+        title_lower = (title or "").lower()
+        reject_hit = self.reject_re.search(title_lower)
+        accept_hit = self.accept_re.search(title_lower)
+
+        text = self.clean_text(description)
+        years = self.extract_years(text)
+        min_years = min(low for low, _ in years) if years else 0
+        tech_stack = ", ".join(self.extract_tech(text))
+
+        # Both kinds of words in the title (e.g. "Junior Team Lead") -> let the model decide
+        if accept_hit and not reject_hit:
+            return (1, f"Rule: '{accept_hit.group(0)}' roles are always relevant.", tech_stack, min_years)
+        if reject_hit and not accept_hit:
+            return (-1, f"Rule: '{reject_hit.group(0)}' title is too senior.", tech_stack, min_years)
+        if reject_hit or not years:
+            return None
+
+        if min_years >= REJECT_MIN_YEARS:
+            return (-1, f"Rule: requires {min_years}+ years of experience.", tech_stack, min_years)
+        max_years = max(high for _, high in years)
+        if max_years <= JUNIOR_MAX_YEARS:
+            return (1, f"Rule: asks for {max_years} years of experience at most.", tech_stack, min_years)
+        return None
@@ -0,0 +1,180 @@
+# ==============================================================================
+# Handles embedding-based relevance scoring from our own labeled jobs
+# Labeled jobs are embedded into a memory-mapped NumPy matrix next to jobs.db,
+# new jobs are scored against it in one vectorized pass (k-nearest-neighbour vote)
+# ==============================================================================
+
+import json
+import os
+import re
+import zlib
+import numpy as np
+from src.local_model import tokenize
+
+INDEX_PREFIX = "relevance_index"
+# The index only starts auto-labeling once it has this many labeled jobs
+MIN_LABELED = 500
+TOP_K = 15
+# Auto-label only outside this band, everything in between goes to the AI
+RELEVANT_THRESHOLD = 0.9
+IRRELEVANT_THRESHOLD = 0.1
+# Neighbours must be at least this similar for the vote to count
+MIN_SIMILARITY = 0.35
+# Auto-labels start with this, so they are never used as training labels themselves (see storage.MODEL_REASON_PREFIXES)
+INDEX_REASON_PREFIX = "Index:"
+# The index is rebuilt once the labeled set changed by this many jobs, or this share of it
+REBUILD_MIN_CHANGE = 100
+REBUILD_SHARE = 0.1
+# Bumped when the labeled set is selected differently, so old indexes are rebuilt once
+INDEX_FORMAT = 2
+
+
+class HashedTfidfEmbedder:
+    """Signed hashing trick + IDF weights. No model download, pure NumPy"""
+
+    def __init__(self, dim=1024):
+        self.dim = dim
+        self.name = f"hashed-tfidf-{dim}"
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _counts(self, docs):
+        matrix = np.zeros((len(docs), self.dim), dtype=np.float32)
+        for row, (title, description) in enumerate(docs):
+            for token in tokenize(title, description):
+                h = zlib.crc32(token.encode("utf-8"))
+                matrix[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return matrix
+
+    def fit(self, docs):
+        df = np.count_nonzero(self._counts(docs), axis=0)
+        self.idf = (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+
+    def embed(self, docs):
+        matrix = self._counts(docs) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    def save(self, path):
+        np.save(path, self.idf)
+
+    def load(self, path):
+        self.idf = np.load(path)
+
+
+class SentenceEmbedder:
+    """Small local CPU model (optional sentence-transformers dependency), e.g. all-MiniLM-L6-v2"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st:{model_name}"
+
+    def fit(self, docs):
+        pass
+
+    def embed(self, docs):
+        texts = [f"{title}. {re.sub(r'<[^>]+>', ' ', (desc or '')[:1000])}" for title, desc in docs]
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+    def save(self, path):
+        pass
+
+    def load(self, path):
+        pass
+
+
+def make_embedder(model_name=None):
+    """EMBEDDING_MODEL setting picks a sentence-transformers model, otherwise hashed TF-IDF"""
+    if model_name:
+        try:
+            return SentenceEmbedder(model_name)
+        except ImportError:
+            print(f"    [!] sentence-transformers not installed, using hashed TF-IDF instead of {model_name}")
+    return HashedTfidfEmbedder()
+
+
+class RelevanceIndex:
+    def __init__(self, storage, embedder=None, prefix=INDEX_PREFIX):
+        self.storage = storage
+        self.embedder = embedder or HashedTfidfEmbedder()
+        self.paths = {
+            "meta": f"{prefix}.json",
+            "vectors": f"{prefix}_vectors.npy",
+            "labels": f"{prefix}_labels.npy",
+            "idf": f"{prefix}_idf.npy",
+        }
+        self.vectors = None
+        self.labels = None
+
+    def _load_meta(self):
+        if not os.path.exists(self.paths["meta"]):
+            return None
+        with open(self.paths["meta"], "r") as f:
+            return json.load(f)
+
+    def _is_stale(self, meta, count):
+        if not meta or meta.get("format") != INDEX_FORMAT or meta.get("embedder") != self.embedder.name:
+            return True
+        return abs(count - meta["count"]) >= max(REBUILD_MIN_CHANGE, REBUILD_SHARE * meta["count"])
+
+    def refresh(self):
+        """Rebuilds the on-disk index if the labeled set changed enough, then memory-maps it. Returns the size"""
+        count = self.storage.count_labeled_jobs()
+        if count < MIN_LABELED:
+            self.vectors = self.labels = None
+            return 0
+
+        meta = self._load_meta()
+        if self._is_stale(meta, count):
+            # Drop our own mapping first, the file is about to be rewritten
+            self.vectors = self.labels = None
+            rows = self.storage.get_labeled_jobs()
+            docs = [(title, desc) for title, desc, _ in rows]
+            self.embedder.fit(docs)
+            first = self.embedder.embed(docs[:1000])
+            vectors = np.lib.format.open_memmap(self.paths["vectors"], mode="w+", dtype=np.float32,
+                                                shape=(len(rows), first.shape[1]))
+            vectors[:len(first)] = first
+            for i in range(1000, len(docs), 1000):
+                vectors[i:i + 1000] = self.embedder.embed(docs[i:i + 1000])
+            vectors.flush()
+            del vectors
+            np.save(self.paths["labels"], np.array([1 if label == 1 else 0 for _, _, label in rows], dtype=np.int8))
+            self.embedder.save(self.paths["idf"])
+            with open(self.paths["meta"], "w") as f:
+                json.dump({"count": len(rows), "embedder": self.embedder.name, "format": INDEX_FORMAT}, f)
+        else:
+            self.embedder.load(self.paths["idf"])
+
+        self.vectors = np.load(self.paths["vectors"], mmap_mode="r")
+        self.labels = np.load(self.paths["labels"])
+        return len(self.labels)
+
+    def score(self, docs):
+        """
+        docs: [(title, description)]
+        Returns an array of relevance probabilities, NaN where the neighbours are too far away to say.
+        """
+        if self.vectors is None or not docs:
+            return np.full(len(docs), np.nan)
+
+        queries = self.embedder.embed(docs)
+        sims = queries @ self.vectors.T                       # (new jobs) x (labeled jobs)
+        k = min(TOP_K, sims.shape[1])
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]    # k nearest per row
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        weights = np.where(top_sims >= MIN_SIMILARITY, top_sims, 0.0)
+        votes = (weights * self.labels[top]).sum(axis=1)
+        total = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, votes / total, np.nan)
+
+    def verdict(self, probability):
+        """(is_relevant, reason) for a confident score, None for the uncertain band"""
+        if np.isnan(probability):
+            return None
+        if probability >= RELEVANT_THRESHOLD:
+            return 1, f"{INDEX_REASON_PREFIX} {probability:.0%} of similar labeled jobs were relevant."
+        if probability <= IRRELEVANT_THRESHOLD:
+            return -1, f"{INDEX_REASON_PREFIX} {1 - probability:.0%} of similar labeled jobs were irrelevant."
+        return None
@@ -0,0 +1,499 @@
+# ==============================================================================
+# Handles the resident scan service
+# One long-lived process keeps the HTTP pool, Workday sessions, the browser and
+# the compiled filters warm between scans. A localhost HTTP API starts scans and
+# streams their progress as JSON lines:
+#   POST /scan[?stream=1]   start a scan (body: options), optionally follow it
+#   GET  /events?since=N    follow every event after N
+#   GET  /status            running scan, counters
+#   POST /cancel            cancel the running scan, the service stays up
+#   POST /shutdown          stop the service (also stops a running scan)
+# Every request needs the per-install token from scan_service.token; browser
+# requests (Origin header) and non-JSON POSTs are refused, so web pages cannot
+# drive it.
+# Run it with: python -m src.scan_service serve   (CLI: scan / status / stop)
+# ==============================================================================
+
+import argparse
+import hmac
+import http.client
+import io
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("SCAN_SERVICE_PORT", 8766))
+# The service exits after this long without scans or requests (the GUI starts it again)
+IDLE_EXIT = 3600
+MAX_EVENTS = 5000
+HEARTBEAT = 15
+# Per-scan settings and their defaults, applied to the environment run_pipeline reads.
+# Every scan starts from the defaults, so an option one scan sent does not stick to the next.
+# The recipient is deliberately not one of them, it is read from authorization.txt
+SCAN_OPTIONS = {
+    "ENABLE_FILTERS": "False",
+    "AI_DISABLED_MODE": "False",
+    "EMAIL_ENABLED": "False",
+    "FULL_SCAN": "False",
+    "SCAN_ALL_TARGETS": "True",
+}
+TOKEN_PATH = "scan_service.token"
+TOKEN_HEADER = "X-Scan-Token"
+
+def service_token(path=TOKEN_PATH):
+    """Per-install secret every client sends, created (owner-only) by whoever needs it first"""
+    try:
+        with open(path, "r") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    return token
+
+def auth_value(key_name, path="authorization.txt"):
+    """A value from authorization.txt, None if it is not set"""
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if "=" in line:
+                    k, v = line.split("=", 1)
+                    if k.strip() == key_name: return v.strip()
+    except OSError:
+        return None
+    return None
+
+class ScanBusyError(Exception):
+    """A scan is already running in the service"""
+
+class ScanLostError(Exception):
+    """The service accepted the scan, but its stream ended before scan_finished (service stopped or died).
+    Not an OSError on purpose: the scan may have run, so callers must not simply start another one"""
+
+class EventLog:
+    """Numbered, bounded event history that readers can block on"""
+    def __init__(self, maxlen=MAX_EVENTS):
+        self.events = deque(maxlen=maxlen)
+        self.seq = 0
+        self.cond = threading.Condition()
+
+    def add(self, event):
+        with self.cond:
+            self.seq += 1
+            event = dict(event, seq=self.seq, time=round(time.time(), 3))
+            self.events.append(event)
+            self.cond.notify_all()
+            return event
+
+    def after(self, seq, timeout):
+        """Events newer than seq, waiting up to timeout for the first one"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > seq, timeout)
+            return [e for e in self.events if e["seq"] > seq]
+
+class EventStdout(io.TextIOBase):
+    """sys.stdout replacement: every printed line becomes a "log" event and still reaches the console"""
+    encoding = "utf-8"
+
+    def __init__(self, emit, console=None):
+        self.emit = emit
+        self.console = console
+        # print() writes the text and the newline separately, keep partial lines per thread
+        self.local = threading.local()
+
+    def write(self, text):
+        if self.console:
+            try:
+                self.console.write(text)
+            except Exception:
+                pass
+        *lines, self.local.buffer = (getattr(self.local, "buffer", "") + text).split("\n")
+        for line in lines:
+            if line.strip():
+                self.emit(line.rstrip())
+        return len(text)
+
+    def flush(self):
+        if self.console:
+            try:
+                self.console.flush()
+            except Exception:
+                pass
+
+class ScanService:
+    def __init__(self, idle_exit=IDLE_EXIT):
+        import run_pipeline
+        from src.fetchers import Fetcher
+        self.pipeline = run_pipeline
+        # Lives as long as the service: HTTP pool, Workday sessions and facets, shared browser
+        self.fetcher = Fetcher()
+        self.events = EventLog()
+        self.idle_exit = idle_exit
+        self.lock = threading.Lock()
+        self.current = None
+        # Stop Event of the running scan, set by cancel()
+        self.stop = None
+        self.scan_count = 0
+        self.last_result = None
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def emit(self, event):
+        return self.events.add(dict(event, scan_id=self.current))
+
+    def log_line(self, message):
+        self.emit({"type": "log", "message": message})
+
+    def start_scan(self, options):
+        """Starts a scan in the background and returns its id. Raises ScanBusyError if one is running"""
+        with self.lock:
+            if self.current is not None:
+                raise ScanBusyError(f"scan {self.current} is already running")
+            self.scan_count += 1
+            scan_id = self.current = self.scan_count
+            self.stop = threading.Event()
+        threading.Thread(target=self._run, args=(scan_id, options, self.stop), daemon=True).start()
+        return scan_id
+
+    def cancel(self):
+        """Asks the running scan to stop. Returns its id, None if no scan is running"""
+        with self.lock:
+            if self.current is None:
+                return None
+            self.stop.set()
+            return self.current
+
+    def _run(self, scan_id, options, stop):
+        for key, default in SCAN_OPTIONS.items():
+            os.environ[key] = str(options.get(key, default))
+        recipient = auth_value("RECIPIENT_EMAIL")
+        if recipient:
+            os.environ["RECIPIENT_EMAIL"] = recipient
+
+        self.emit({"type": "scan_started", "options": options})
+        start = time.monotonic()
+        status, error, scanned = "ok", None, None
+        try:
+            scanned = self.pipeline.run_scan(self.fetcher, on_event=self.emit, stop=stop)
+        except self.pipeline.ScanCancelled:
+            status = "cancelled"
+            print("[*] Scan cancelled.")
+        except Exception as e:
+            status, error = "error", repr(e)
+            print(f"[!] Scan failed: {error}")
+
+        result = {"type": "scan_finished", "status": status, "error": error, "targets": scanned,
+                  "seconds": round(time.monotonic() - start, 1)}
+        self.emit(result)
+        with self.lock:
+            self.current = None
+            self.stop = None
+            self.last_result = dict(result, scan_id=scan_id)
+        self.touch()
+
+    def status(self):
+        return {
+            "running": self.current is not None,
+            "scan_id": self.current,
+            "scans": self.scan_count,
+            "last_result": self.last_result,
+            "last_event": self.events.seq,
+            "uptime": round(time.time() - self.started_at),
+            "pid": os.getpid(),
+        }
+
+    def idle(self):
+        return self.current is None and time.monotonic() - self.last_activity > self.idle_exit
+
+
+class ScanServiceHandler(BaseHTTPRequestHandler):
+    # No Content-Length on streams: the response ends when the connection closes
+    protocol_version = "HTTP/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, since, scan_id=None):
+        """Writes events after `since` as JSON lines; with scan_id, only that scan and until it finishes"""
+        service = self.server.service
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                events = service.events.after(since, HEARTBEAT)
+                if not events:
+                    # Keeps proxies happy and notices clients that went away
+                    self.wfile.write(b'{"type": "heartbeat"}\n')
+                    self.wfile.flush()
+                    continue
+                for event in events:
+                    since = event["seq"]
+                    if scan_id is not None and event.get("scan_id") != scan_id:
+                        continue
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                    if scan_id is not None and event["type"] == "scan_finished":
+                        self.wfile.flush()
+                        return
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _refused(self):
+        """Sends the error and returns True unless the request is from a local client holding the token"""
+        if self.headers.get("Origin") is not None:
+            self._send_json(403, {"error": "browser requests are not allowed"})
+        elif not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.server.token):
+            self._send_json(401, {"error": f"missing or wrong {TOKEN_HEADER}"})
+        elif self.command == "POST" and self.headers.get_content_type() != "application/json":
+            self._send_json(415, {"error": "body must be application/json"})
+        else:
+            return False
+        return True
+
+    def do_GET(self):
+        if self._refused():
+            return
+        service = self.server.service
+        service.touch()
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/status":
+            self._send_json(200, service.status())
+        elif url.path == "/events":
+            self._stream(int(query.get("since", [service.events.seq])[0]))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self._refused():
+            return
+        service = self.server.service
+        service.touch()
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/scan":
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                options = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(options, dict):
+                    raise ValueError(options)
+            except ValueError:
+                self._send_json(400, {"error": "body must be a JSON object"})
+                return
+            since = service.events.seq
+            try:
+                scan_id = service.start_scan(options)
+            except ScanBusyError as e:
+                self._send_json(409, {"error": str(e), "scan_id": service.current})
+                return
+            if query.get("stream", ["0"])[0] == "1":
+                self._stream(since, scan_id)
+            else:
+                self._send_json(202, {"scan_id": scan_id})
+        elif url.path == "/cancel":
+            scan_id = service.cancel()
+            if scan_id is None:
+                self._send_json(409, {"error": "no scan is running"})
+            else:
+                self._send_json(202, {"cancelling": scan_id})
+        elif url.path == "/shutdown":
+            self._send_json(200, {"stopping": True})
+            # Hard exit: a running scan has non-daemon worker threads
+            threading.Timer(0.2, os._exit, args=(0,)).start()
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, idle_exit=IDLE_EXIT):
+    service = ScanService(idle_exit)
+    server = ThreadingHTTPServer((host, port), ScanServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.token = service_token()
+    sys.stdout = EventStdout(service.log_line, sys.stdout)
+    print(f"[*] Scan service listening on http://{host}:{port} (pid {os.getpid()})")
+
+    def watchdog():
+        while not service.idle():
+            time.sleep(30)
+        print(f"[*] Scan service idle for {idle_exit}s, exiting.")
+        server.shutdown()
+    threading.Thread(target=watchdog, daemon=True).start()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class ScanClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=5, token=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.token = token or service_token()
+
+    def _request(self, method, path, body=None, timeout=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout or self.timeout)
+        headers = {TOKEN_HEADER: self.token}
+        data = None
+        if method == "POST":
+            data = json.dumps(body or {}).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        conn.request(method, path, body=data, headers=headers)
+        return conn, conn.getresponse()
+
+    def _json(self, method, path, body=None):
+        conn, response = self._request(method, path, body)
+        try:
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+    def status(self):
+        return self._json("GET", "/status")[1]
+
+    def is_alive(self):
+        try:
+            self.status()
+            return True
+        except OSError:
+            return False
+
+    def cancel(self):
+        """Cancels the running scan. Returns its id, None if no scan was running"""
+        return self._json("POST", "/cancel")[1].get("cancelling")
+
+    def shutdown(self):
+        return self._json("POST", "/shutdown")[1]
+
+    def scan(self, options=None, on_event=None):
+        """
+        Starts a scan and follows it. on_event(event) gets every event as it happens.
+        Returns the scan_finished event. Raises ScanBusyError if a scan is already running,
+        OSError if the service could not be reached or refused the scan (nothing was started)
+        and ScanLostError if the stream of the accepted scan broke off.
+        """
+        # Heartbeats arrive every HEARTBEAT seconds, so a silent socket means the service died
+        conn, response = self._request("POST", "/scan?stream=1", options, timeout=HEARTBEAT * 4)
+        try:
+            if response.status == 409:
+                raise ScanBusyError(json.loads(response.read()).get("error"))
+            if response.status != 200:
+                raise OSError(f"scan service answered {response.status}")
+            result = None
+            try:
+                for line in response:
+                    event = json.loads(line)
+                    if event["type"] == "heartbeat":
+                        continue
+                    if on_event:
+                        on_event(event)
+                    if event["type"] == "scan_finished":
+                        result = event
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                raise ScanLostError(f"scan service stream broke off: {e!r}") from e
+            if result is None:
+                raise ScanLostError("scan service closed the stream before the scan finished")
+            return result
+        finally:
+            conn.close()
+
+
+def start_service_process(env=None, startupinfo=None, wait=20, log_path="scan_service.log"):
+    """Launches `python -m src.scan_service serve` in the background and waits until it answers"""
+    client = ScanClient()
+    with open(log_path, "a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, "-u", "-m", "src.scan_service", "serve"],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            env=env, startupinfo=startupinfo
+        )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if client.is_alive():
+            return client
+        time.sleep(0.2)
+    raise OSError(f"scan service did not start within {wait}s (see {log_path})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident scan service for the job pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="Run the service in the foreground")
+    serve_cmd.add_argument("--host", default=DEFAULT_HOST)
+    serve_cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_cmd.add_argument("--idle-exit", type=int, default=IDLE_EXIT, help="Seconds without activity before exiting")
+    scan_cmd = sub.add_parser("scan", help="Trigger a scan and print its progress")
+    scan_cmd.add_argument("--no-ai", action="store_true")
+    scan_cmd.add_argument("--no-filters", action="store_true")
+    scan_cmd.add_argument("--no-email", action="store_true")
+    scan_cmd.add_argument("--start", action="store_true", help="Start the service first if it is not running")
+    scan_cmd.add_argument("--json", action="store_true", help="Print raw events")
+    sub.add_parser("status", help="Show the service status")
+    sub.add_parser("cancel", help="Cancel the running scan")
+    sub.add_parser("stop", help="Stop the service")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.idle_exit)
+        sys.exit(0)
+
+    client = ScanClient()
+    try:
+        if args.command == "status":
+            print(json.dumps(client.status(), indent=2))
+        elif args.command == "cancel":
+            scan_id = client.cancel()
+            print(f"[*] Cancelling scan {scan_id}." if scan_id else "[*] No scan is running.")
+        elif args.command == "stop":
+            client.shutdown()
+            print("[*] Scan service stopped.")
+        elif args.command == "scan":
+            if args.start and not client.is_alive():
+                start_service_process()
+            options = {
+                "ENABLE_FILTERS": str(not args.no_filters),
+                "AI_DISABLED_MODE": str(args.no_ai),
+                "EMAIL_ENABLED": str(not args.no_email),
+            }
+            def show(event):
+                if args.json:
+                    print(json.dumps(event))
+                elif event["type"] == "log":
+                    print(event["message"])
+            result = client.scan(options, show)
+            print(f"[*] Scan {result['scan_id']} {result['status']} in {result['seconds']}s")
+            sys.exit(0 if result["status"] == "ok" else 1)
+    except (ScanBusyError, ScanLostError) as e:
+        print(f"[!] {e}")
+        sys.exit(1)
+    except OSError as e:
+        print(f"[!] Scan service unreachable on {DEFAULT_HOST}:{DEFAULT_PORT} ({e}). Start it with: python -m src.scan_service serve")
+        sys.exit(1)
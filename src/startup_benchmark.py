@@ -0,0 +1,71 @@
+# ==============================================================================
+# Handles measuring the cold start of the scan subprocess
+# Runs `python -X importtime -c "import run_pipeline"` in a fresh interpreter,
+# reports the slowest imports and fails when a guard is broken:
+#   python -m src.startup_benchmark --runs 5 --max-ms 400
+# ==============================================================================
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Must stay out of the scan's startup, they are imported by the stages that use them
+HEAVY_MODULES = ["openai", "pydantic", "pandas", "jobspy", "numpy", "playwright", "bs4"]
+DEFAULT_MODULE = "run_pipeline"
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure(module=DEFAULT_MODULE, cwd="."):
+    """(wall_ms, {module: (self_us, cumulative_us)}) of one cold import"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark for the scan subprocess")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="Module imported at startup")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start (best one is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the best wall time is above this")
+    parser.add_argument("--allow", nargs="*", default=[], help="Heavy modules allowed at startup")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = [measure(args.module, root) for _ in range(args.runs)]
+    wall_ms, modules = min(runs, key=lambda run: run[0])
+
+    print(f"[*] import {args.module}: best {wall_ms:.0f}ms wall over {args.runs} runs, "
+          f"{modules.get(args.module, (0, 0))[1] / 1000:.0f}ms in imports, {len(modules)} modules")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    slowest = sorted(modules.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+    failed = False
+    loaded = [m for m in HEAVY_MODULES if m in modules and m not in args.allow]
+    if loaded:
+        print(f"[!] Heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.max_ms is not None and wall_ms > args.max_ms:
+        print(f"[!] Startup {wall_ms:.0f}ms is over the {args.max_ms:.0f}ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,72 @@
 
 import sqlite3
 
+# Schema upgrades, applied in order. The DB remembers its version in PRAGMA user_version,
+# so migration N runs once when user_version < N.
+MIGRATIONS = [
+    # 1: index-backed hot queries (AI pending scan, GUI feed, email notifications)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_relevant_found ON jobs (is_relevant, found_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_email_relevant ON jobs (sent_email, is_relevant)",
+    ],
+    # 2: content-addressed AI verdict cache (see analysis.verdict_key)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS ai_verdicts (
+            content_hash TEXT PRIMARY KEY,
+            is_relevant INTEGER,
+            ai_reason TEXT,
+            tech_stack TEXT,
+            years_required INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ],
+    # 3: detail endpoint for boards whose list API has no description (Workday)
+    [
+        "ALTER TABLE jobs ADD COLUMN description_url TEXT",
+    ],
+    # 4: per-target scan history for the adaptive scheduler (see target_scheduler), times are epoch seconds
+    [
+        """
+        CREATE TABLE IF NOT EXISTS target_stats (
+            target TEXT PRIMARY KEY,
+            scans INTEGER DEFAULT 0,
+            errors INTEGER DEFAULT 0,
+            last_scan_at REAL,
+            last_change_at REAL,
+            last_new_jobs INTEGER DEFAULT 0,
+            avg_new_jobs REAL DEFAULT 0,
+            avg_latency_ms REAL,
+            interval_s REAL,
+            next_due_at REAL
+        )
+        """,
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Verdicts our own models wrote (relevance index, local model), never used to train them
+MODEL_REASON_PREFIXES = ("Index:", "Local model:")
+
 class JobStorage:
     def __init__(self, db_path="jobs.db"):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # The GUI and the pipeline open the DB at the same time, wait for locks instead of failing
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
         self.cursor = self.conn.cursor()
+        self._configure_connection()
         self._initialize_db()
 
+    def _configure_connection(self):
+        """Per-connection performance settings"""
+        # WAL lets the dashboard read while the scraper writes
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        # Safe with WAL, and avoids an fsync on every commit
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA cache_size=-20000")      # ~20MB page cache
+        self.cursor.execute("PRAGMA mmap_size=268435456")    # 256MB memory-mapped reads
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+
     def _initialize_db(self):
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS jobs (
@@ -31,6 +91,108 @@ class JobStorage:
             )
         """)
         self.conn.commit()
+        self._migrate()
+
+    def _migrate(self):
+        """Brings the schema up to SCHEMA_VERSION"""
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        for target_version in range(version + 1, SCHEMA_VERSION + 1):
+            with self.conn:
+                for statement in MIGRATIONS[target_version - 1]:
+                    self.cursor.execute(statement)
+                self.cursor.execute(f"PRAGMA user_version = {target_version}")
+
+    def get_known_ids(self):
+        """All stored job IDs, loaded once at scan start so fetchers can skip known jobs"""
+        self.cursor.execute("SELECT id FROM jobs")
+        return {row[0] for row in self.cursor.fetchall()}
+
+    def save_analyses(self, rows):
+        """
+        Writes many AI verdicts in one transaction.
+        rows: (is_relevant, ai_reason, tech_stack, years_required, job_id) tuples
+        """
+        if not rows:
+            return
+        with self.conn:
+            self.cursor.executemany("""
+                UPDATE jobs SET is_relevant = ?, ai_reason = ?,
+                tech_stack = ?, years_required = ? WHERE id = ?
+            """, rows)
+
+    def get_labeled_jobs(self, exclude_prefixes=MODEL_REASON_PREFIXES):
+        """
+        (title, description, is_relevant) of jobs with an actual verdict. Jobs saved while the AI was
+        disabled are stored as relevant with no ai_reason, they say nothing about relevance.
+        """
+        self.cursor.execute("SELECT title, description, is_relevant FROM jobs WHERE " + self._labeled_where(exclude_prefixes),
+                            [prefix + "%" for prefix in exclude_prefixes])
+        return self.cursor.fetchall()
+
+    def count_labeled_jobs(self, exclude_prefixes=MODEL_REASON_PREFIXES):
+        self.cursor.execute("SELECT COUNT(*) FROM jobs WHERE " + self._labeled_where(exclude_prefixes),
+                            [prefix + "%" for prefix in exclude_prefixes])
+        return self.cursor.fetchone()[0]
+
+    def _labeled_where(self, exclude_prefixes):
+        excluded = "".join(" AND ai_reason NOT LIKE ?" for _ in exclude_prefixes)
+        return f"is_relevant IN (1, -1) AND ai_reason IS NOT NULL{excluded}"
+
+    def get_missing_descriptions(self, since):
+        """(id, company, description_url) of jobs found after `since` whose description is still empty"""
+        self.cursor.execute("""
+            SELECT id, company, description_url FROM jobs
+            WHERE description_url IS NOT NULL AND COALESCE(description, '') = '' AND found_at > ?
+        """, (since,))
+        return self.cursor.fetchall()
+
+    def save_descriptions(self, rows):
+        """rows: (description, job_id) tuples"""
+        if not rows:
+            return
+        with self.conn:
+            self.cursor.executemany("UPDATE jobs SET description = ? WHERE id = ?", rows)
+
+    def get_target_stats(self):
+        """{target: {column: value}} of every target scanned before"""
+        self.cursor.execute("SELECT * FROM target_stats")
+        columns = [c[0] for c in self.cursor.description]
+        return {row[0]: dict(zip(columns, row)) for row in self.cursor.fetchall()}
+
+    def save_target_stats(self, rows):
+        """rows: dicts with every target_stats column"""
+        if not rows:
+            return
+        with self.conn:
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO target_stats (target, scans, errors, last_scan_at, last_change_at,
+                    last_new_jobs, avg_new_jobs, avg_latency_ms, interval_s, next_due_at)
+                VALUES (:target, :scans, :errors, :last_scan_at, :last_change_at,
+                    :last_new_jobs, :avg_new_jobs, :avg_latency_ms, :interval_s, :next_due_at)
+            """, rows)
+
+    def get_cached_verdicts(self, content_hashes):
+        """{content_hash: (is_relevant, ai_reason, tech_stack, years_required)} for the hashes we know"""
+        verdicts = {}
+        for i in range(0, len(content_hashes), 500):
+            chunk = content_hashes[i:i + 500]
+            self.cursor.execute(f"""
+                SELECT content_hash, is_relevant, ai_reason, tech_stack, years_required
+                FROM ai_verdicts WHERE content_hash IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for row in self.cursor.fetchall():
+                verdicts[row[0]] = tuple(row[1:])
+        return verdicts
+
+    def save_verdicts(self, rows):
+        """rows: (content_hash, is_relevant, ai_reason, tech_stack, years_required) tuples"""
+        if not rows:
+            return
+        with self.conn:
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO ai_verdicts (content_hash, is_relevant, ai_reason, tech_stack, years_required)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
 
     def job_exists(self, job_id):
         self.cursor.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,))
@@ -44,14 +206,51 @@ class JobStorage:
         """
         try:
             self.cursor.execute("""
-                INSERT INTO jobs (id, company, title, location, url, posted_on, description, is_relevant)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO jobs (id, company, title, location, url, posted_on, description, is_relevant, description_url)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 job['id'], job['company'], job['title'], job['location'], 
                 job['url'], job['posted_on'], job.get('description', ''),
-                relevance
+                relevance, job.get('description_url')
             ))
             self.conn.commit()
             return True
         except sqlite3.IntegrityError:
-            return False
\ No newline at end of file
+            return False
+
+    def save_jobs(self, jobs, relevance=0):
+        """
+        Bulk version of save_job: one transaction for the whole batch.
+        Duplicates (in the DB or inside the batch) are ignored.
+        Returns the list of jobs that were actually new.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        # One lookup per chunk instead of one job_exists() per job
+        ids = list({str(job['id']) for job in jobs})
+        seen = set()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            self.cursor.execute(f"SELECT id FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            seen.update(row[0] for row in self.cursor.fetchall())
+
+        new_jobs = []
+        for job in jobs:
+            if str(job['id']) in seen:
+                continue
+            seen.add(str(job['id']))
+            new_jobs.append(job)
+
+        with self.conn:
+            self.cursor.executemany("""
+                INSERT INTO jobs (id, company, title, location, url, posted_on, description, is_relevant, description_url)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO NOTHING
+            """, [
+                (str(job['id']), job['company'], job['title'], job['location'],
+                 job['url'], job['posted_on'], job.get('description', ''), relevance, job.get('description_url'))
+                for job in new_jobs
+            ])
+        return new_jobs
\ No newline at end of file
@@ -0,0 +1,94 @@
+# ==============================================================================
+# Handles deciding which targets a scan visits
+# Every target keeps its own interval in jobs.db (target_stats): a board that
+# posted new jobs drops back to MIN_INTERVAL, a quiet or failing one doubles
+# its interval up to MAX_INTERVAL. Each tick only scans the targets that are due
+# ==============================================================================
+
+import threading
+import time
+
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 24 * 3600
+BACKOFF = 2
+# Weight of the latest scan in the running averages
+SMOOTHING = 0.3
+# Targets due a little after the tick are scanned now instead of a whole tick late
+DUE_SLACK = 120
+# Exit code of run_pipeline.py when no target was due (not an error, but not a scan either)
+NOTHING_DUE_EXIT = 3
+
+def target_key(target_config):
+    """Stats key of a target. Names are unique in targets.json and are what saved jobs are tagged with"""
+    return target_config['name']
+
+class TargetScheduler:
+    def __init__(self, storage, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, backoff=BACKOFF):
+        self.storage = storage
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stats = storage.get_target_stats()
+        # Fetch results of the current scan: key -> (seconds or None, error)
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def due(self, targets, now=None):
+        """Targets never scanned or whose next_due_at has passed"""
+        now = now or time.time()
+        return [t for t in targets if (self.stats.get(target_key(t), {}).get('next_due_at') or 0) <= now + DUE_SLACK]
+
+    def next_due_at(self, targets):
+        """Earliest next_due_at among `targets` (None if one was never scanned)"""
+        times = [self.stats.get(target_key(t), {}).get('next_due_at') for t in targets]
+        return None if not times or None in times else min(times)
+
+    def on_stats(self, target_config, seconds, error=False):
+        """Fetch callback (see Fetcher.fetch_many), may be called from any worker thread"""
+        with self.lock:
+            self.results[target_key(target_config)] = (seconds, error)
+
+    def commit(self, targets, new_counts, now=None):
+        """
+        Records one scan of `targets` and schedules their next one.
+        new_counts: {target name: jobs saved to jobs.db}. A target that never reported (killed on timeout) counts as an error.
+        """
+        now = now or time.time()
+        rows = []
+        with self.lock:
+            for target in targets:
+                key = target_key(target)
+                seconds, error = self.results.get(key, (None, True))
+                rows.append(self._update(key, seconds, error, new_counts.get(key, 0), now))
+            self.results.clear()
+        self.storage.save_target_stats(rows)
+        self.stats.update((row['target'], row) for row in rows)
+        return rows
+
+    def _update(self, key, seconds, error, new_jobs, now):
+        old = self.stats.get(key) or {}
+        interval = old.get('interval_s') or self.min_interval
+        if new_jobs:
+            interval, last_change = self.min_interval, now
+        else:
+            interval, last_change = min(interval * self.backoff, self.max_interval), old.get('last_change_at')
+
+        avg_new = new_jobs if not old else old['avg_new_jobs'] + SMOOTHING * (new_jobs - old['avg_new_jobs'])
+        # Failed fetches return early, only successful ones say how slow a board is
+        avg_latency = old.get('avg_latency_ms')
+        if seconds is not None and not error:
+            latency_ms = seconds * 1000
+            avg_latency = latency_ms if avg_latency is None else avg_latency + SMOOTHING * (latency_ms - avg_latency)
+
+        return {
+            'target': key,
+            'scans': (old.get('scans') or 0) + 1,
+            'errors': (old.get('errors') or 0) + int(bool(error)),
+            'last_scan_at': now,
+            'last_change_at': last_change,
+            'last_new_jobs': new_jobs,
+            'avg_new_jobs': avg_new,
+            'avg_latency_ms': avg_latency,
+            'interval_s': interval,
+            'next_due_at': now + interval,
+        }
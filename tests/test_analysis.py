@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.analysis import AnalysisStage
+from src.brain import JobBrain, RateLimitedError
+
+JOBS = [(1, "Backend Engineer", "Python"), (2, "Data Engineer", "SQL"), (3, "QA Engineer", "Selenium")]
+
+
+def verdict(job_id):
+    return SimpleNamespace(job_id=job_id, is_relevant=True, reason="ok", tech_stack=[], years_required=0)
+
+
+class OneByOneBackend:
+    structured = False
+    name = "fake"
+
+    def analyze(self, title, description):
+        if title == "Data Engineer":
+            raise RateLimitedError("429", retry_after=0.01)
+        return verdict(title)
+
+
+def test_rate_limit_keeps_the_jobs_already_analyzed():
+    with pytest.raises(RateLimitedError) as caught:
+        JobBrain(backend=OneByOneBackend()).analyze_batch(JOBS)
+    assert list(caught.value.partial) == [1]
+
+
+class ScriptedBrain:
+    """Rate limited after job 1, then a batch answer that leaves job 3 out"""
+    cache_namespace = ""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_batch(self, jobs, fallback=True):
+        self.calls.append(([job[0] for job in jobs], fallback))
+        if len(self.calls) == 1:
+            error = RateLimitedError("429", retry_after=0.01)
+            error.partial = {1: verdict(1)}
+            raise error
+        return {job[0]: verdict(job[0]) for job in jobs if job[0] != 3 or len(jobs) == 1}
+
+
+def test_stage_retries_only_the_missing_jobs_through_the_limiter(monkeypatch):
+    brain = ScriptedBrain()
+    stage = AnalysisStage(brain, storage=None, max_concurrency=2, log=lambda message: None)
+    acquired = []
+    acquire = stage.limiter.acquire
+    monkeypatch.setattr(stage.limiter, "acquire", lambda: acquired.append(1) or acquire())
+
+    results = stage._analyze(JOBS)
+    assert all(found is not None for _, found in results)
+    assert brain.calls == [([1, 2, 3], False), ([2, 3], False), ([3], False)]
+    assert len(acquired) == 3
+    assert stage.limiter.limit == 1
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from src.fetchers.browser import BrowserService
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def add_init_script(self, script):
+        pass
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePage:
+    def on(self, event, handler):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, **kwargs):
+        self.launched.append(FakeBrowser())
+        return self.launched[-1]
+
+
+@pytest.fixture
+def service():
+    service = BrowserService(max_contexts=1)
+    chromium = FakeChromium()
+    service.playwright = type("Playwright", (), {"chromium": chromium})()
+    yield service
+    service.browser = service.playwright = None
+    service.close()
+
+
+def test_a_disconnected_browser_is_relaunched(service):
+    chromium = service.playwright.chromium
+    first = service.run(service._browser())
+    assert service.run(service._browser()) is first
+    first.connected = False
+    second = service.run(service._browser())
+    assert second is not first and len(chromium.launched) == 2
+
+
+def test_a_hung_page_times_out_and_frees_its_slot(service):
+    async def hang(page, network):
+        await asyncio.sleep(30)
+
+    async def title(page, network):
+        return "ok"
+
+    with pytest.raises(TimeoutError):
+        service.with_page(hang, timeout=0.1)
+    assert service.browser.contexts[0].closed
+    # The only slot is free again
+    assert service.with_page(title, timeout=1) == "ok"
@@ -0,0 +1,39 @@
+import threading
+import time
+
+import run_pipeline
+
+
+class RecordingStorage:
+    flushes = []
+
+    def save_jobs(self, jobs, relevance=0):
+        self.flushes.append((time.monotonic(), len(jobs)))
+        return jobs
+
+
+def test_steady_stream_is_flushed_every_interval(monkeypatch):
+    monkeypatch.setattr(run_pipeline, "JobStorage", RecordingStorage)
+    monkeypatch.setattr(run_pipeline, "DB_BATCH_SIZE", 10_000)
+    monkeypatch.setattr(run_pipeline, "DB_BATCH_INTERVAL_MS", 100)
+    monkeypatch.setenv("ENABLE_FILTERS", "False")
+    RecordingStorage.flushes = []
+    new_counts = {}
+
+    consumer = threading.Thread(target=run_pipeline.database_worker, args=(new_counts,))
+    consumer.start()
+    start = time.monotonic()
+    # One job every 2ms for 0.6s: get() never times out
+    i = 0
+    while time.monotonic() - start < 0.6:
+        run_pipeline.job_queue.put(({"id": str(i), "title": f"Engineer {i}"}, "Acme"))
+        i += 1
+        time.sleep(0.002)
+    run_pipeline.job_queue.join()
+    run_pipeline.job_queue.put(None)
+    consumer.join()
+
+    during_stream = [t for t, _ in RecordingStorage.flushes if t - start < 0.6]
+    assert len(during_stream) >= 3
+    assert sum(n for _, n in RecordingStorage.flushes) == i
+    assert new_counts == {"Acme": i}
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from src import filters
+from src.filters import KeywordFilter
+
+RULES = """
+# global rules
+senior
+sr
+team lead   # inline comment
++engineer
++developer
+
+[Acme]
+!team lead
+manager
++analyst
+"""
+
+
+@pytest.fixture
+def keyword_filter(tmp_path, monkeypatch):
+    monkeypatch.setattr(filters, "RELOAD_CHECK_INTERVAL", 0)
+    path = tmp_path / "filters.txt"
+    path.write_text(RULES, encoding="utf-8")
+    return KeywordFilter(str(path))
+
+
+def test_global_excludes_and_includes(keyword_filter):
+    assert keyword_filter.match("Senior Backend Engineer") == "senior"
+    assert keyword_filter.match("Sr. Developer") == "sr"
+    assert keyword_filter.match("Engineering Team Lead") == "team lead"
+    assert keyword_filter.match("Product Designer") == "(not in include list)"
+    assert keyword_filter.match("Backend Engineer") is None
+
+
+def test_whole_words_only(keyword_filter):
+    # "sr" inside another word is not a hit
+    assert keyword_filter.match("Firmware Developer (SRE team)") is None
+
+
+def test_company_overrides(keyword_filter):
+    assert keyword_filter.match("Developer Team Lead", "Acme") is None
+    assert keyword_filter.match("Engineer Manager", "ACME") == "manager"
+    assert keyword_filter.match("Data Analyst", "Acme") is None
+    # Other companies keep the global rules
+    assert keyword_filter.match("Engineer Manager", "Globex") is None
+    assert keyword_filter.match("Data Analyst", "Globex") == "(not in include list)"
+
+
+def test_reloads_when_the_file_changes(keyword_filter):
+    assert keyword_filter.match("Backend Engineer") is None
+    with open(keyword_filter.path, "w", encoding="utf-8") as f:
+        f.write("backend\n")
+    stat = os.stat(keyword_filter.path)
+    os.utime(keyword_filter.path, (stat.st_atime, stat.st_mtime + 5))
+    assert keyword_filter.match("Backend Engineer") == "backend"
+
+
+def test_missing_file_keeps_everything(tmp_path):
+    assert KeywordFilter(str(tmp_path / "missing.txt")).match("Senior Engineer") is None
+
+
+def test_fingerprint_follows_the_rules(keyword_filter):
+    before = keyword_filter.fingerprint()
+    assert keyword_filter.fingerprint() == before
+    with open(keyword_filter.path, "a", encoding="utf-8") as f:
+        f.write("principal\n")
+    stat = os.stat(keyword_filter.path)
+    os.utime(keyword_filter.path, (stat.st_atime, stat.st_mtime + 5))
+    assert keyword_filter.fingerprint() != before
@@ -0,0 +1,10 @@
+from src.fetchers.http_client import HttpClient
+
+
+def test_generic_sites_get_a_bucket_each():
+    client = HttpClient()
+    assert client.bucket_for("generic", "jobs.acme.com") is not client.bucket_for("generic", "careers.globex.com")
+    assert client.bucket_for("generic", "jobs.acme.com") is client.bucket_for("generic", "jobs.acme.com")
+    # ATS APIs share one budget whatever the board
+    assert client.bucket_for("greenhouse", "a.example") is client.bucket_for("greenhouse", "b.example")
+    assert client.bucket_for("generic", "jobs.acme.com").rate == client.rate_limits["generic"]["rate"]
@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("jobspy")
+
+from src.fetchers.jobspy_aggr import frame_to_jobs
+
+
+def test_keeps_israeli_rows_and_cleans_them():
+    frame = pd.DataFrame({
+        "id": ["li-1", None, "li-3"],
+        "company": ["Acme", "Globex", "Initech"],
+        "title": ["Backend Engineer", "Data Analyst", "QA"],
+        "location": ["Tel Aviv, Israel", "Haifa, IL", "Berlin, Germany"],
+        "date_posted": ["2026-10-01", None, "2026-10-02"],
+        "job_url": ["https://x/1", "https://x/2", "https://x/3"],
+        "description": ["Python", math.nan, "Go"],
+    })
+    jobs = frame_to_jobs(frame)
+    assert [j["company"] for j in jobs] == ["Acme", "Globex"]
+    # Missing id falls back to the URL, missing description to the placeholder
+    assert jobs[1]["id"] == "https://x/2"
+    assert jobs[1]["description"] == "Check Link for details"
+    assert jobs[0] == {
+        "company": "Acme", "title": "Backend Engineer", "location": "Tel Aviv, Israel",
+        "posted_on": "2026-10-01", "url": "https://x/1", "id": "li-1", "description": "Python",
+    }
+
+
+def test_missing_columns_and_no_matches():
+    assert frame_to_jobs(pd.DataFrame({"title": ["QA"], "location": ["Paris"]})) == []
+    jobs = frame_to_jobs(pd.DataFrame({"title": ["QA"], "location": ["Israel"], "job_url": ["https://x/9"]}))
+    assert jobs[0]["id"] == "https://x/9" and jobs[0]["company"] is None
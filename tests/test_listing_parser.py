@@ -0,0 +1,78 @@
+import importlib
+
+import pytest
+
+from src.fetchers import listing_parser
+from src.fetchers.listing_parser import ListingParser
+
+HTML = """
+<ul>
+  <li class="job"><a href="/jobs/1"><h3><span>Software</span><span>Engineer</span></h3></a></li>
+  <li class="job"><a href="/jobs/2"><h3>Junior
+      Data   Analyst</h3></a> <span class="team">BI</span></li>
+  <li class="job"><a href="https://twitter.com/acme"><h3>Follow us on Twitter</h3></a></li>
+  <li class="job"><a href="/jobs/3"><h3>QA</h3></a></li>
+</ul>
+"""
+CONFIG = {"row_selector": "li.job", "title_selector": "h3", "location": "Tel Aviv"}
+EXPECTED = [
+    ("https://acme.com/jobs/1", "Software Engineer"),
+    ("https://acme.com/jobs/2", "Junior Data Analyst"),
+]
+
+
+def use_backend(monkeypatch, backend):
+    """Points listing_parser at one backend, whatever the module picked when it was imported"""
+    if backend == "selectolax":
+        lexbor = pytest.importorskip("selectolax.lexbor")
+        monkeypatch.setattr(listing_parser, "HTMLParser", lexbor.LexborHTMLParser, raising=False)
+    elif backend == "lxml":
+        pytest.importorskip("lxml.html")
+        pytest.importorskip("cssselect")
+        monkeypatch.setattr(listing_parser, "lxml", importlib.import_module("lxml"), raising=False)
+        monkeypatch.setattr(listing_parser, "CSSSelector", importlib.import_module("lxml.cssselect").CSSSelector, raising=False)
+    else:
+        monkeypatch.setattr(listing_parser, "soupsieve", pytest.importorskip("soupsieve"), raising=False)
+        monkeypatch.setattr(listing_parser, "BeautifulSoup", pytest.importorskip("bs4").BeautifulSoup, raising=False)
+    monkeypatch.setattr(listing_parser, "BACKEND", backend)
+
+
+@pytest.mark.parametrize("backend", ["selectolax", "lxml", "bs4"])
+def test_backends_give_the_same_jobs(monkeypatch, backend):
+    use_backend(monkeypatch, backend)
+    jobs = ListingParser(CONFIG, "Acme").parse(HTML, "https://acme.com/careers")
+    assert [(j["url"], j["title"]) for j in jobs] == EXPECTED
+    assert all(j["company"] == "Acme" and j["location"] == "Tel Aviv" and j["id"] == j["url"] for j in jobs)
+
+
+@pytest.mark.parametrize("backend", ["selectolax", "lxml", "bs4"])
+def test_falls_back_to_links_without_rows(monkeypatch, backend):
+    use_backend(monkeypatch, backend)
+    config = dict(CONFIG, row_selector="div.missing", href_include=["/jobs/"])
+    jobs = ListingParser(config, "Acme").parse(HTML, "https://acme.com/careers")
+    assert [j["title"] for j in jobs] == ["Software Engineer", "Junior Data Analyst"]
+
+
+@pytest.mark.parametrize("backend", ["selectolax", "lxml", "bs4"])
+def test_only_the_listing_container_is_read(monkeypatch, backend):
+    use_backend(monkeypatch, backend)
+    page = f"""
+    <nav><a href="/jobs/featured">Featured Engineer Role</a></nav>
+    <main id="listing">{HTML}</main>
+    """
+    config = dict(CONFIG, container_selector="#listing")
+    jobs = ListingParser(config, "Acme").parse(page, "https://acme.com/careers")
+    assert [(j["url"], j["title"]) for j in jobs] == EXPECTED
+    # The all-links fallback stays inside the container too
+    config = dict(config, row_selector="div.missing", href_include=["/jobs/"])
+    assert [j["title"] for j in ListingParser(config, "Acme").parse(page, "https://acme.com/")] == \
+        ["Software Engineer", "Junior Data Analyst"]
+    # A container that is not on the page: the whole page is read
+    config = dict(CONFIG, container_selector="#gone", row_selector="a[href^='/jobs/']")
+    assert len(ListingParser(config, "Acme").parse(page, "https://acme.com/")) == 3
+
+
+def test_from_links_filters():
+    parser = ListingParser({"href_exclude": ["/blog/"]}, "Acme")
+    links = [("/jobs/1", "Backend Developer"), ("/blog/1", "Our culture"), ("", "No link"), ("/jobs/2", "QA")]
+    assert [j["url"] for j in parser.from_links(links, "https://acme.com/")] == ["https://acme.com/jobs/1"]
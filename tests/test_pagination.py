@@ -0,0 +1,32 @@
+import threading
+import time
+
+from src.fetchers.pagination import paginate
+
+
+def test_pages_come_back_in_order():
+    def fetch_page(page):
+        time.sleep(0.05 if page == 0 else 0)
+        return page * 10
+    assert list(paginate(range(6), fetch_page, window=3)) == [(p, p * 10) for p in range(6)]
+
+
+def test_breaking_out_requests_nothing_more_and_does_not_wait():
+    requested = []
+    release = threading.Event()
+
+    def fetch_page(page):
+        requested.append(page)
+        if page > 0:
+            # Slow pages in flight when the caller stops
+            release.wait(5)
+        return page
+
+    start = time.monotonic()
+    for page, _ in paginate(range(20), fetch_page, window=3):
+        break
+    assert time.monotonic() - start < 1
+    release.set()
+    time.sleep(0.1)
+    # At most the first window plus the page queued to refill it, never the rest of the listing
+    assert {0, 1, 2} <= set(requested) <= {0, 1, 2, 3}
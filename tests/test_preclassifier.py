@@ -0,0 +1,52 @@
+import pytest
+
+from src.preclassifier import PreClassifier
+
+
+@pytest.fixture
+def rules():
+    return PreClassifier()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5+ years of experience with Python", [(5, 5)]),
+    ("3-5 years' experience in backend development", [(3, 5)]),
+    ("At least 4 yrs of hands-on experience", [(4, 4)]),
+    ("Minimum of 2 years experience", [(2, 2)]),
+    ("2 years of experience required.", [(2, 2)]),
+    ("You have 3 years of backend experience", [(3, 3)]),
+])
+def test_requirements_are_read(rules, text, expected):
+    assert rules.extract_years(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "With over 20 years of experience in the industry, Acme leads the market.",
+    "Acme has 10 years of experience building chips.",
+    "We bring 25+ years of experience to our customers.",
+])
+def test_company_boilerplate_is_not_a_requirement(rules, text):
+    assert rules.extract_years(text) == []
+
+
+def test_boilerplate_does_not_reject_a_neutral_title(rules):
+    description = "<p>With over 20 years of experience in the industry, we build networks.</p>"
+    assert rules.classify("Software Engineer", description) is None
+
+
+def test_title_rules(rules):
+    assert rules.classify("Senior Backend Engineer", "")[0] == -1
+    assert rules.classify("Junior Data Analyst", "")[0] == 1
+    # Both kinds of words: the model decides
+    assert rules.classify("Junior Team Lead", "") is None
+
+
+def test_years_rules(rules):
+    assert rules.classify("Backend Engineer", "Requirements: 5+ years of experience with Go")[:2] == \
+        (-1, "Rule: requires 5+ years of experience.")
+    assert rules.classify("Backend Engineer", "0-2 years of experience with Python")[0] == 1
+    assert rules.classify("Backend Engineer", "3 years of experience is a must") is None
+
+
+def test_tech_stack_handles_symbols(rules):
+    assert rules.extract_tech("We use C++, C# and Node.js, plus Python.") == ["c++", "c#", "node.js", "python"]
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.relevance_index import RelevanceIndex, MIN_LABELED, REBUILD_MIN_CHANGE
+from src.storage import JobStorage
+
+
+def add_jobs(storage, start, count, reason="AI verdict."):
+    storage.cursor.executemany(
+        "INSERT INTO jobs (id, title, description, is_relevant, ai_reason) VALUES (?, ?, ?, ?, ?)",
+        [(f"job-{i}", f"Engineer {i}", "python backend", 1 if i % 2 else -1, reason) for i in range(start, start + count)]
+    )
+    storage.conn.commit()
+
+
+def built_count(index):
+    with open(index.paths["meta"]) as f:
+        return json.load(f)["count"]
+
+
+def test_unanalyzed_jobs_are_not_labels(tmp_path):
+    storage = JobStorage(str(tmp_path / "jobs.db"))
+    add_jobs(storage, 0, MIN_LABELED, reason=None)
+    assert RelevanceIndex(storage, prefix=str(tmp_path / "index")).refresh() == 0
+
+
+def test_rebuilds_only_after_enough_new_labels(tmp_path):
+    storage = JobStorage(str(tmp_path / "jobs.db"))
+    add_jobs(storage, 0, MIN_LABELED)
+    index = RelevanceIndex(storage, prefix=str(tmp_path / "index"))
+    assert index.refresh() == MIN_LABELED
+
+    add_jobs(storage, MIN_LABELED, 5)
+    assert index.refresh() == MIN_LABELED
+    assert built_count(index) == MIN_LABELED
+
+    add_jobs(storage, MIN_LABELED + 5, REBUILD_MIN_CHANGE)
+    assert index.refresh() == MIN_LABELED + 5 + REBUILD_MIN_CHANGE
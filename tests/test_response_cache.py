@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.fetchers import base
+from src.fetchers.base import BaseFetcher
+from src.fetchers.response_cache import ResponseCache
+
+URL = "https://boards-api.greenhouse.io/v1/boards/acme/jobs"
+
+
+def response(body, status=200):
+    return SimpleNamespace(status_code=status, content=body, headers={"ETag": '"v1"'})
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("FULL_SCAN", raising=False)
+    return ResponseCache(str(tmp_path / "http_cache.db"))
+
+
+class BoardFetcher(BaseFetcher):
+    def __init__(self, body):
+        self.body = body
+        self.sent_headers = []
+
+    def http_get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(headers)
+        return response(self.body)
+
+    def fetch(self, target_config):
+        return []
+
+
+def test_same_body_is_unchanged(cache):
+    cache.store(URL, response(b"[1]"), ["1"])
+    assert cache.is_unchanged(URL, response(b"[1]"))
+    assert cache.is_unchanged(URL, response(b"", status=304))
+    assert not cache.is_unchanged(URL, response(b"[1, 2]"))
+    assert cache.conditional_headers(URL) == {"If-None-Match": '"v1"'}
+
+
+def test_full_scan_is_read_per_call(cache, monkeypatch):
+    cache.store(URL, response(b"[1]"), ["1"])
+    monkeypatch.setenv("FULL_SCAN", "True")
+    assert not cache.is_unchanged(URL, response(b"[1]"))
+    assert cache.conditional_headers(URL) == {}
+    monkeypatch.setenv("FULL_SCAN", "False")
+    assert cache.is_unchanged(URL, response(b"[1]"))
+
+
+def test_entry_is_trusted_only_while_its_jobs_are_stored(cache, monkeypatch):
+    monkeypatch.setattr(base, "get_response_cache", lambda: cache)
+    fetcher = BoardFetcher(b"[1, 2]")
+    fetcher.remember_response(URL, response(b"[1, 2]"), [{"id": "1"}, {"id": "2"}])
+
+    # Job 2 never reached jobs.db (failed save, filtered, reset DB): the board is parsed again
+    fetcher.known_ids = frozenset({"1"})
+    assert fetcher.conditional_get(URL) is not None
+    assert fetcher.sent_headers[-1] == {}
+
+    fetcher.known_ids = frozenset({"1", "2", "3"})
+    assert fetcher.conditional_get(URL) is None
+    assert fetcher.sent_headers[-1] == {"If-None-Match": '"v1"'}
+
+
+def test_filtered_jobs_do_not_block_the_cache(cache, monkeypatch):
+    monkeypatch.setattr(base, "get_response_cache", lambda: cache)
+    fetcher = BoardFetcher(b"[1, 2]")
+    fetcher.job_filter = lambda job: "Senior" not in job["title"]
+    fetcher.filter_key = "rules-v1"
+    fetcher.remember_response(URL, response(b"[1, 2]"),
+                              [{"id": "1", "title": "Engineer"}, {"id": "2", "title": "Senior Engineer"}])
+
+    # Job 2 was filtered, so it is not in jobs.db: the board is still skipped
+    fetcher.known_ids = frozenset({"1"})
+    assert fetcher.conditional_get(URL) is None
+
+    # Edited filters.txt may let job 2 through now: the board is parsed again
+    fetcher.filter_key = "rules-v2"
+    assert fetcher.conditional_get(URL) is not None
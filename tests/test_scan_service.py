@@ -0,0 +1,155 @@
+import functools
+import http.client
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import run_pipeline
+from src import engine, scan_service
+from src.engine import AppEngine
+from src.scan_service import ScanClient, ScanService, ScanServiceHandler, SCAN_OPTIONS, TOKEN_HEADER, service_token
+
+
+class StubService:
+    def __init__(self):
+        self.scans = []
+
+    def touch(self):
+        pass
+
+    def status(self):
+        return {"running": False}
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScanServiceHandler)
+    server.service = StubService()
+    server.token = service_token(str(tmp_path / "scan_service.token"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, headers, body=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    status = response.status
+    conn.close()
+    return status
+
+
+def test_token_file_is_reused(tmp_path):
+    path = str(tmp_path / "scan_service.token")
+    assert service_token(path) == service_token(path)
+
+
+def test_client_with_token_is_accepted(server):
+    client = ScanClient(*server.server_address, token=server.token)
+    assert client.status() == {"running": False}
+
+
+def test_missing_or_wrong_token_is_refused(server):
+    assert request(server, "GET", "/status", {}) == 401
+    assert request(server, "GET", "/status", {TOKEN_HEADER: "guess"}) == 401
+
+
+def test_browser_requests_are_refused(server):
+    headers = {TOKEN_HEADER: server.token, "Origin": "https://example.com", "Content-Type": "application/json"}
+    assert request(server, "POST", "/shutdown", headers, b"{}") == 403
+
+
+def test_posts_must_be_json(server):
+    headers = {TOKEN_HEADER: server.token, "Content-Type": "text/plain"}
+    assert request(server, "POST", "/scan", headers, json.dumps({"EMAIL_ENABLED": "True"})) == 415
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.environments = []
+
+    def run_scan(self, fetcher, on_event=None, stop=None):
+        self.environments.append({key: os.environ.get(key) for key in SCAN_OPTIONS})
+        return 1
+
+
+def test_every_scan_starts_from_the_default_options(monkeypatch):
+    for key in SCAN_OPTIONS:
+        monkeypatch.setenv(key, "stale")
+    service = ScanService()
+    service.pipeline = RecordingPipeline()
+    service._run(1, {"FULL_SCAN": "True", "EMAIL_ENABLED": True}, threading.Event())
+    service._run(2, {}, threading.Event())
+    first, second = service.pipeline.environments
+    assert first == dict(SCAN_OPTIONS, FULL_SCAN="True", EMAIL_ENABLED="True")
+    assert second == SCAN_OPTIONS
+
+
+class BlockingPipeline:
+    """Runs until the scan is cancelled"""
+    ScanCancelled = run_pipeline.ScanCancelled
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.scans = 0
+
+    def run_scan(self, fetcher, on_event=None, stop=None):
+        self.scans += 1
+        self.started.set()
+        if stop.wait(5):
+            raise self.ScanCancelled()
+        return 1
+
+
+@pytest.fixture
+def live_service(tmp_path, monkeypatch):
+    for key in SCAN_OPTIONS:
+        monkeypatch.setenv(key, "")
+    monkeypatch.chdir(tmp_path)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScanServiceHandler)
+    server.service = ScanService()
+    server.service.pipeline = BlockingPipeline()
+    server.token = service_token()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_cancel_stops_the_scan_and_keeps_the_service(live_service):
+    client = ScanClient(*live_service.server_address, token=live_service.token)
+    assert client.cancel() is None
+    results = []
+    scan = threading.Thread(target=lambda: results.append(client.scan({})))
+    scan.start()
+    assert live_service.service.pipeline.started.wait(5)
+    assert client.cancel() == 1
+    scan.join(5)
+    assert results[0]["status"] == "cancelled"
+    assert client.status()["running"] is False
+
+
+def test_stop_does_not_start_a_second_pipeline(live_service, monkeypatch):
+    host, port = live_service.server_address
+    monkeypatch.setattr(scan_service, "ScanClient", functools.partial(ScanClient, host, port, token=live_service.token))
+    processes = []
+    monkeypatch.setattr(engine.subprocess, "Popen", lambda *args, **kwargs: processes.append(args))
+    app = AppEngine(storage=None)
+    logs, finished = [], threading.Event()
+    run = threading.Thread(target=app.run_pipeline, args=(logs.append, finished.set))
+    run.start()
+    assert live_service.service.pipeline.started.wait(5)
+    app.stop_pipeline()
+    run.join(5)
+
+    assert finished.is_set()
+    assert "SYSTEM: Scan stopped" in logs
+    assert processes == []
+    assert live_service.service.pipeline.scans == 1
+    # The warm service is still there for the next scan
+    assert ScanClient(host, port, token=live_service.token).status()["running"] is False
@@ -0,0 +1,40 @@
+from src.storage import JobStorage, SCHEMA_VERSION
+from src.local_model import load_labeled_rows
+
+
+def make_storage(tmp_path):
+    return JobStorage(str(tmp_path / "jobs.db"))
+
+
+def insert_jobs(storage, rows):
+    """rows: (id, is_relevant, ai_reason)"""
+    storage.cursor.executemany(
+        "INSERT INTO jobs (id, title, description, is_relevant, ai_reason) VALUES (?, ?, 'desc', ?, ?)",
+        [(job_id, f"title {job_id}", label, reason) for job_id, label, reason in rows]
+    )
+    storage.conn.commit()
+
+
+def test_migrations_reach_schema_version(tmp_path):
+    storage = make_storage(tmp_path)
+    assert storage.cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_labeled_jobs_are_actual_verdicts_only(tmp_path):
+    storage = make_storage(tmp_path)
+    insert_jobs(storage, [
+        ("saved-with-ai-off", 1, None),
+        ("ai-yes", 1, "Junior friendly."),
+        ("ai-no", -1, "Requires 5 years."),
+        ("index", 1, "Index: 95% of similar labeled jobs were relevant."),
+        ("local", -1, "Local model: 10% likely to fit a junior."),
+        ("pending", 0, None),
+    ])
+    titles = sorted(title for title, _, _ in storage.get_labeled_jobs())
+    assert titles == ["title ai-no", "title ai-yes"]
+
+
+def test_local_model_trains_on_actual_verdicts_only(tmp_path):
+    storage = make_storage(tmp_path)
+    insert_jobs(storage, [("saved-with-ai-off", 1, None), ("ai-no", -1, "Requires 5 years.")])
+    assert load_labeled_rows(str(tmp_path / "jobs.db")) == [("title ai-no", "desc", 0)]
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.fetchers import base
+from src.fetchers.concurrency import AsyncFetchEngine
+from src.fetchers.greenhouse import GreenhouseFetcher
+from src.fetchers.response_cache import ResponseCache
+from src.storage import JobStorage
+from src.target_scheduler import TargetScheduler, DUE_SLACK, SMOOTHING
+
+MIN, MAX = 900, 7200
+TARGETS = [{"name": "Active"}, {"name": "Quiet"}, {"name": "Broken"}]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return JobStorage(str(tmp_path / "jobs.db"))
+
+
+def make(storage):
+    return TargetScheduler(storage, min_interval=MIN, max_interval=MAX)
+
+
+def scan(scheduler, new_counts, now, failed=("Broken",)):
+    for target in TARGETS:
+        if target["name"] not in failed:
+            scheduler.on_stats(target, 0.5, False)
+    return {row["target"]: row for row in scheduler.commit(TARGETS, new_counts, now=now)}
+
+
+def test_never_scanned_targets_are_due(storage):
+    assert make(storage).due(TARGETS, now=1000) == TARGETS
+    assert make(storage).next_due_at(TARGETS) is None
+
+
+def test_active_boards_stay_fast_and_quiet_ones_back_off(storage):
+    scheduler = make(storage)
+    rows = scan(scheduler, {"Active": 2}, now=1000)
+    assert rows["Active"]["interval_s"] == MIN
+    assert rows["Active"]["last_change_at"] == 1000
+    assert rows["Quiet"]["interval_s"] == 2 * MIN
+    assert rows["Quiet"]["last_change_at"] is None
+
+    for i in range(1, 6):
+        rows = scan(scheduler, {}, now=1000 + i)
+    assert rows["Quiet"]["interval_s"] == MAX
+    assert rows["Active"]["last_change_at"] == 1000
+
+    # New jobs bring a backed-off board straight back to the shortest interval
+    rows = scan(scheduler, {"Quiet": 1}, now=2000)
+    assert rows["Quiet"]["interval_s"] == MIN
+    assert rows["Quiet"]["next_due_at"] == 2000 + MIN
+
+
+def test_failures_are_counted_and_back_off(storage):
+    scheduler = make(storage)
+    scan(scheduler, {}, now=1000)
+    rows = scan(scheduler, {}, now=2000)
+    assert rows["Broken"]["errors"] == 2 and rows["Broken"]["scans"] == 2
+    assert rows["Broken"]["avg_latency_ms"] is None
+    assert rows["Quiet"]["errors"] == 0
+    assert rows["Quiet"]["avg_latency_ms"] == pytest.approx(500)
+
+
+def test_averages_start_from_the_first_scan(storage):
+    scheduler = make(storage)
+    assert scan(scheduler, {"Active": 10}, now=1000)["Active"]["avg_new_jobs"] == 10
+    expected = 10 + SMOOTHING * (0 - 10)
+    assert scan(scheduler, {}, now=2000)["Active"]["avg_new_jobs"] == pytest.approx(expected)
+
+
+def test_due_uses_the_saved_schedule(storage):
+    scan(make(storage), {"Active": 1}, now=1000)
+    scheduler = make(storage)
+    assert [t["name"] for t in scheduler.due(TARGETS, now=1000 + MIN - DUE_SLACK)] == ["Active"]
+    assert scheduler.due(TARGETS, now=1000 + 2 * MIN) == TARGETS
+    assert scheduler.next_due_at(TARGETS) == 1000 + MIN
+
+
+def test_a_board_answering_an_error_counts_as_failed(storage, tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "get_response_cache", lambda: ResponseCache(str(tmp_path / "http_cache.db")))
+    fetcher = GreenhouseFetcher()
+    monkeypatch.setattr(fetcher, "http_get", lambda url, **kwargs: SimpleNamespace(status_code=503))
+    target = {"name": "Acme", "type": "greenhouse", "board_token": "acme"}
+    scheduler = make(storage)
+    results = []
+
+    asyncio.run(AsyncFetchEngine().run([(fetcher, target)], lambda t, jobs: results.append(jobs), scheduler.on_stats))
+    row = scheduler.commit([target], {}, now=1000)[0]
+    assert results == [[]]
+    assert row["errors"] == 1 and row["avg_latency_ms"] is None
@@ -0,0 +1,65 @@
+from src.fetchers import workday
+from src.fetchers.json_store import JsonStore
+from src.fetchers.workday import WorkdayFetcher, find_israel_facets, tenant_parts
+
+URL = "https://acme.wd1.myworkdayjobs.com/wday/cxs/acme/External/jobs"
+
+
+def test_failed_handshake_is_retried_after_a_while(tmp_path, monkeypatch):
+    monkeypatch.setattr(workday, "session_store", JsonStore(str(tmp_path / "sessions.json")))
+    monkeypatch.setattr(workday, "GLOBAL_SESSIONS", {})
+    monkeypatch.setattr(workday, "_failed_handshakes", {})
+    fetcher = WorkdayFetcher()
+    handshakes = []
+    def handshake(url):
+        handshakes.append(url)
+        return None if len(handshakes) == 1 else [{"name": "wd-session", "value": "1"}]
+    monkeypatch.setattr(fetcher, "_get_selenium_handshake", handshake)
+    monkeypatch.setattr(fetcher, "_session_from_cookies", lambda cookies: cookies)
+
+    base_url, tenant_id, portal_id, key = tenant_parts(URL)
+    target = {"name": "Acme", "url": URL}
+    assert fetcher._get_session(target, key, base_url, tenant_id, portal_id) is None
+    # Other page workers of the same scan do not handshake again
+    assert fetcher._get_session(target, key, base_url, tenant_id, portal_id) is None
+    assert len(handshakes) == 1
+
+    workday._failed_handshakes[key] -= workday.HANDSHAKE_RETRY
+    assert fetcher._get_session(target, key, base_url, tenant_id, portal_id) == [{"name": "wd-session", "value": "1"}]
+    assert len(handshakes) == 2
+
+
+def test_country_facet_wins():
+    facets = [
+        {"facetParameter": "locations", "values": [
+            {"id": "tlv", "descriptor": "Tel Aviv"}, {"id": "hfa", "descriptor": "Haifa"}]},
+        {"facetParameter": "locationCountry", "values": [{"id": "il", "descriptor": "Israel"}]},
+    ]
+    assert find_israel_facets(facets) == {"locationCountry": ["il"]}
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_only_auth_errors_drop_the_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(workday, "facet_store", JsonStore(str(tmp_path / "facets.json")))
+    fetcher = WorkdayFetcher()
+    dropped = []
+    monkeypatch.setattr(fetcher, "_get_session", lambda *args: object())
+    monkeypatch.setattr(fetcher, "_location_facets", lambda *args: {})
+    monkeypatch.setattr(fetcher, "_drop_session", dropped.append)
+    target = {"name": "Acme", "url": URL}
+    for status in (429, 500, 503):
+        monkeypatch.setattr(fetcher.http, "post", lambda *args, **kwargs: FakeResponse(status))
+        assert fetcher.fetch_page(target, 0) == ([], 0, 0, status)
+    assert dropped == []
+    # A rejected bigger page size is not a dead session either
+    monkeypatch.setattr(fetcher.http, "post", lambda *args, **kwargs: FakeResponse(400))
+    fetcher.fetch_page(target, 0, probe=True)
+    assert dropped == []
+    for status in (400, 401, 403):
+        monkeypatch.setattr(fetcher.http, "post", lambda *args, **kwargs: FakeResponse(status))
+        fetcher.fetch_page(target, 0)
+    assert dropped == [tenant_parts(URL)[3]] * 3